@@ -1,235 +1,305 @@
 import os
 import time
-import pandas as pd
 import asyncio
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from contextlib import nullcontext
 from selenium.webdriver.common.by import By
-import re
-from selenium.webdriver.chrome.service import Service as ChromeService
 from concurrent.futures import ThreadPoolExecutor
-from webdriver_manager.chrome import ChromeDriverManager
-import json
-import psutil
-import gc
-
-def extract_price(link_soup):
-    try:
-        price_div = link_soup.find('p', class_='LFHeading')
-        if price_div:
-            price_val = price_div.text.strip()
-            if price_val:
-                return price_val
-    except Exception:
-        pass
-    return None
-
-
-def extract_information(link_soup):
-    try:
-        informations = link_soup.find('ul', class_='details-page__params')
-        information = {}
-        if informations:
-            for info in informations.find_all('li'):
-                label_element = info.find('p')
-                value_element = info.find('a')
-                if label_element and value_element:
-                    label = label_element.text.strip() if label_element else "Unknown Label"
-                    value = value_element.text.strip() if value_element else "No Value"
-                    information[label] = value
-
-        return json.dumps(information, ensure_ascii=False)
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return None
-
-
-def extract_owner_name(link_soup):
-    try:
-        owner_name_div = link_soup.find('span', class_='userName-text')
-        if owner_name_div:
-            owner_name = owner_name_div.text.strip()
-            return owner_name
-    except Exception:
-        pass
-    return None
-
-
-def extract_content(link_soup):
-    try:
-        # Find the specific div containing the content
-        content_div = link_soup.find('div', class_='description__wrap')
-        if content_div:
-            # Extract text from all <p> tags and join them
-            paragraphs = content_div.find('span')
-            content = "\n".join(p.get_text(strip=True) for p in paragraphs)
-            return content
-    except Exception as e:
-        print(f"An error occurred: {e}")
-    return None
-
-
-def extract_statistics(link_soup):
-    try:
-        statistics = link_soup.find('div', class_='impressions').find('span')
-        views = statistics.text.strip() if statistics else None
-        return views
-    except Exception:
-        pass
-    return None, None
-
-
-def extract_owner_number(link_soup):
-    try:
-        phone_item_div = link_soup.find('div', class_='phone-number__wrap')
-        if phone_item_div:
-            phone_number_a = phone_item_div.find('a')['href']
-            if phone_number_a:
-                phone_number = phone_number_a.replace('tel:', '').strip()
-            else:
-                phone_number = None
-        else:
-            phone_number = None
-        return phone_number
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        phone_number = None
-        return phone_number
-
-
-def extract_date_information(link_soup):
-    try:
-        date_div = link_soup.find_all('div', class_='about-ad-info__date')
-        date1 = date_div[0].find_all('span')[1].text.strip()
-        date2 = date_div[1].find_all('span')[1].text.strip()
-        return date1, date2
-    except Exception:
-        pass
-    return None, None
-
-
-def extract_product_title(link_soup):
-    try:
-        title_div = link_soup.find('h1', class_='ad-detail-title')
-        if title_div:
-            title = title_div.text.strip()
-            return title
-    except Exception:
-        pass
-    return None
-
-
-def extract_property_info(url, item_id):
-    try:
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        # service = ChromeService(ChromeDriverManager().install(), log_path=os.devnull)
-        driver = webdriver.Chrome(options=chrome_options)
-
-        driver.get(url)
-        time.sleep(2)
-
-        WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.CLASS_NAME, 'show-button')))
+from scraping_core.concurrency import AdaptiveLimiter
+from scraping_core.metrics import Metrics
+from scraping_core.browser_profile import BrowserProfile
+from scraping_core.driver_pool import DriverPool
+from scraping_core.tab_pool import TabPool
+from scraping_core.supervisor import BrowserSupervisor
+from scraping_core.http_client import HttpClient
+from scraping_core.writer import make_writer
+from scraping_core.records import normalize_batch
+from scraping_core.archive import HtmlArchive
+from scraping_core.changelog import Changelog
+from scraping_core.crawl_state import CrawlState
+from scraping_core.pipeline import Pipeline
+from scraping_core.resilience import DomainLimiter, Retrier
+from scraping_core.runner import crawl_arguments, run_crawl
+from scraping_core.work_queue import WorkQueue
+from scraping_core.index_pages import fetch_index_links, fetch_index_page
+from scraping_core.waits import Waiter
+from scraping_core.sites.lalafo import LALAFO
+from scraping_core.parsing import get_backend
+
+SITE = LALAFO.at(os.environ.get('LALAFO_BASE_URL'))  # e.g. a local scraping_core.mock_site
+METRICS = Metrics(SITE.name)  # stage timings, success/failure counters and live gauges
+METRICS_PORT = 9201  # serve /metrics on localhost (worker N on port + N); None to disable
+METRICS_LOG_INTERVAL = 60  # seconds between structured metrics log lines
+MAX_CONCURRENCY = 30  # ceiling for detail fetches, drivers and threads
+MAX_PAGES_PER_DRIVER = 50
+RSS_BUDGET_MB = 8192  # this process plus its browsers; drivers are recycled above it
+SUPERVISOR = BrowserSupervisor(rss_budget_mb=RSS_BUDGET_MB)
+BROWSER_MODE = 'selenium'  # or 'playwright': listings open as tabs of a few shared browsers
+TABS_PER_BROWSER = 10
+BROWSER = BrowserProfile(allow=SITE.browser_allow)  # no images, fonts, media, maps or trackers
+INDEX_CONCURRENCY = 2  # index pages fetched at once
+ITEM_QUEUE_SIZE = 200  # listings discovered ahead of the detail workers
+PAGES = range(1, 10000)
+QUEUE_NAME = SITE.name + ':pages'
+HTTP_INDEX = True  # fetch index pages without a browser, falling back to Chrome
+HTTP_CONNECTIONS_PER_HOST = 8
+PREWARM_DRIVERS = True  # start the pool's browsers before the crawl
+CONCURRENCY = AdaptiveLimiter(SITE.name, maximum=MAX_CONCURRENCY)
+RATE_LIMIT = DomainLimiter(rate=5, burst=10)  # requests per second to each host
+RETRIES = Retrier(SITE.name, attempts=3)
+MAX_ITEM_ATTEMPTS = 5  # listings that failed this many times are left out of --retry-failed
+WAITS = Waiter(SITE.name, default_timeout=5, metrics=METRICS)
+PARSER_BACKEND = 'lxml'  # 'selectolax', 'lxml' or 'bs4' (the reference backend)
+OUTPUT_FORMAT = 'csv'  # or 'parquet' for typed, columnar output
+# Rows are written typed: floats, ints and ISO dates rather than the page text. Start a new output file
+# when switching, as older files hold page text; None writes the page text as before.
+NORMALIZE = normalize_batch
+INDEX_ONLY = False  # write rows straight from the index cards instead of opening every listing
+ENRICH = 'changed'  # with INDEX_ONLY: open the detail page of 'new', 'changed' or 'none' of the cards
+RECRAWL = False  # refetch only new or changed cards and write an insert/update/delete changelog
+STATE_PATH = 'crawl_state.sqlite'  # finished pages and scraped items, for resuming
+ARCHIVE_HTML = False  # keep every fetched listing page in ARCHIVE, so --reparse can re-extract it
+ARCHIVE = HtmlArchive('html_archive', SITE.name)
+
+
+def detail_chrome_options():
+    return BROWSER.options()
+
+
+def extract_listing(html, url, item_id, phone_number=None):
+    return SITE.extract(html, url, item_id, get_backend(PARSER_BACKEND), phone_number)
+
+
+def parse_property_info(html, url, item_id, phone_number=None):
+    # Archived before extraction, so pages a broken selector fails on can be reparsed later
+    if ARCHIVE_HTML:
+        with METRICS.span('archive'):
+            ARCHIVE.put(item_id, url, html, phone_number)
+    with METRICS.span('parse'):
+        return extract_listing(html, url, item_id, phone_number)
+
+
+def extract_property_info(url, item_id, pool):
+    # Errors are raised so RETRIES can decide whether the listing is worth another try
+    with pool.driver() as driver:
+        pool.navigate(driver, url)
+
+        WAITS.wait_for(driver, By.CLASS_NAME, 'show-button')
         elements = driver.find_elements(By.CLASS_NAME, 'show-button')
         if elements:
             element = elements[0]
-            element.click()
-            WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.CLASS_NAME, 'phone-item')))
+            with METRICS.span('phone_click'):
+                element.click()
+            WAITS.wait_for(driver, By.CLASS_NAME, 'phone-item')
         else:
             print("Show button not found for this listing.")
-        updated_html = driver.page_source
-        link_soup = BeautifulSoup(updated_html, 'html.parser')
-        phone_number = extract_owner_number(link_soup)
-        owner_name = extract_owner_name(link_soup)
-        information = extract_information(link_soup)
-        price = extract_price(link_soup)
-        content = extract_content(link_soup)
-        views = extract_statistics(link_soup)
-        created_date, updated_date = extract_date_information(link_soup)
-        title = extract_product_title(link_soup)
-        driver.quit()
-        df1 = {'item_id': item_id, 'title': title, 'url': url,
-               'phone_number': phone_number,
-               'owner_name': owner_name,
-               'price': price,
-               'information': information, 'content': content, 'views': views, 'created_date': created_date,
-               'updated_date': updated_date}
-        del item_id,title,url,phone_number,owner_name,price,information,content,views,created_date,updated_date,driver,link_soup
-        return df1
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return None
-
-def cleanup_chrome_processes():
-    """Kill all remaining chrome.exe and chromedriver processes."""
-    # os.system('taskkill /F /IM chrome.exe')  # Kill chrome.exe
-    # os.system('taskkill /F /IM chromedriver.exe')
-    for proc in psutil.process_iter():
-        try:
-            if proc.name() in ["chrome.exe", "chromedriver.exe"]:
-                proc.kill()
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
-            print(e)
-            pass
-async def main():
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')
-
-    if not os.path.exists("lalafo.csv"):
-        pd.DataFrame().to_csv("lalafo.csv", sep=',', encoding='utf-8', mode='w', index=False)
-    semaphore = asyncio.Semaphore(30)
-    with ThreadPoolExecutor() as executor:
+        with METRICS.span('page_source'):
+            updated_html = driver.page_source
+    return parse_property_info(updated_html, url, item_id)
+
+
+async def extract_property_info_tab(tabs, url, item_id, loop, executor):
+    async with tabs.page() as page:
+        await tabs.navigate(page, url)
+        # Raises when the button never shows up, for RETRIES like the Chrome path
+        button = await WAITS.wait_for_selector(page, '.show-button')
+        async with METRICS.span('phone_click'):
+            await button.click()
+        await WAITS.wait_for_selector(page, '.phone-item')
+        async with METRICS.span('page_source'):
+            updated_html = await page.content()
+    return await loop.run_in_executor(executor, parse_property_info, updated_html, url, item_id)
+
+
+def index_ready(driver):
+    WAITS.wait_for(driver, By.CLASS_NAME, 'lf-ad-tile__link')
+
+
+async def main(queue_path=None, worker=None, retry_failed=False):
+    pool = DriverPool(CONCURRENCY.limit, detail_chrome_options, max_pages=MAX_PAGES_PER_DRIVER,
+                      rate_limit=RATE_LIMIT, supervisor=SUPERVISOR, on_start=BROWSER.apply, metrics=METRICS)
+    CONCURRENCY.on_change = pool.resize
+    tabs = None
+    if BROWSER_MODE == 'playwright':
+        tabs = TabPool(browsers=-(-MAX_CONCURRENCY // TABS_PER_BROWSER), tabs_per_browser=TABS_PER_BROWSER,
+                       profile=BROWSER, rate_limit=RATE_LIMIT, metrics=METRICS)
+    if PREWARM_DRIVERS and BROWSER_MODE == 'selenium':
+        pool.prewarm()
+    state = CrawlState(STATE_PATH, SITE.name)
+    METRICS.gauge('concurrency_limit', lambda: CONCURRENCY.limit)
+    METRICS.gauge('retries', lambda: RETRIES.retries)
+    METRICS.gauge('circuit_open', lambda: int(RETRIES.breaker.open))
+    METRICS.start(port=METRICS_PORT + (worker or 0) if METRICS_PORT else None, log_interval=METRICS_LOG_INTERVAL)
+    with state, pool, ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as executor:
         loop = asyncio.get_event_loop()
+        http = HttpClient(per_host=HTTP_CONNECTIONS_PER_HOST, rate_limit=RATE_LIMIT, metrics=METRICS)
+        changelog = Changelog(state, SITE.cards) if RECRAWL else None
+        cards = INDEX_ONLY or RECRAWL
+
+        unenriched = set()
+
+        def flushed(rows):
+            state.mark_done([row for row in rows if row.get('source', 'detail') == 'detail'])
+            if cards:
+                deleted = [row['item_id'] for row in rows if row.get('change') == 'delete']
+                state.forget_cards(deleted)
+                # Rows retried with --retry-failed have no card fields to fingerprint, and a card whose
+                # enrichment failed must come up as changed again next time, so it is fetched once more
+                state.remember_cards((row['item_id'], SITE.cards.fingerprint(row)) for row in rows
+                                     if 'source' in row and row.get('change') != 'delete'
+                                     and row['item_id'] not in unenriched)
+                unenriched.difference_update(row['item_id'] for row in rows)
 
-        async def process_item(item):
-          async with semaphore:
-            link = 'https://lalafo.az' + item['href']
-            item_id = item['href'].split('-')[-1]
-            data = await loop.run_in_executor(executor, extract_property_info, link, item_id)
-            if data:
-                data['page'] = page
-                df = pd.DataFrame([data])
-                df.to_csv("lalafo.csv", sep=',', encoding='utf-8', mode='a', header=False, index=False)
-                del df, data
+        columns = SITE.card_columns if cards else SITE.columns
+        # Card rows have their own columns, so they never share a file with detail rows
+        stem = "lalafo_changes" if RECRAWL else "lalafo_cards" if INDEX_ONLY else "lalafo"
+        writer = make_writer(OUTPUT_FORMAT, stem if worker is None else f"{stem}.{worker}",
+                             columns + ('page',) + (('change',) if RECRAWL else ()), on_flush=flushed,
+                             normalize=NORMALIZE, metrics=METRICS)
 
+        async def fetch_page(page):
+            print(f"Scraping page {page}...")
+            url = f'{SITE.base_url}/?page={page}'
+            return await RETRIES.call(fetch_index_links, url, 'a.lf-ad-tile__link', get_backend(PARSER_BACKEND),
+                                      http=http if HTTP_INDEX else None,
+                                      pool=pool, executor=executor, ready=index_ready)
 
-        for page in range(6725, 10000):
+        async def fetch_cards(page):
             print(f"Scraping page {page}...")
-            url = f'https://lalafo.az/?page={page}'
-            service = ChromeService(ChromeDriverManager().install(), log_path=os.devnull)
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            driver.get(url)
-            time.sleep(5)
-            # try:
-            #     WebDriverWait(driver, 10).until(
-            #         EC.presence_of_element_located((By.CLASS_NAME, 'lf-ad-tile__link'))
-            #     )
-            # except Exception as e:
-            #     print(f"Error waiting for page load: {e}")
-            #     driver.quit()
-            #     continue
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            content = soup.find_all('a', class_='lf-ad-tile__link')
-
-            tasks = [process_item(item) for item in content]
-            await asyncio.gather(*tasks)
-            driver.quit()
-            del content, soup, tasks , driver
-            gc.collect()
-            # if page % 10 == 0:
-            #     print("Completed 100 pages. Taking a 1-minute break...")
-            #     time.sleep(60)
-            #     cleanup_chrome_processes()
-            #     time.sleep(60)
-
-
-start_time = time.time()
-asyncio.run(main())
-end_time = time.time()
-execution_time = end_time - start_time
-print(f"Execution time: {execution_time} seconds")
+            url = f'{SITE.base_url}/?page={page}'
+            backend = get_backend(PARSER_BACKEND)
+            return await RETRIES.call(fetch_index_page, url, lambda html: SITE.cards.extract(html, backend, url),
+                                      http=http if HTTP_INDEX else None,
+                                      pool=pool, executor=executor, ready=index_ready)
+
+        async def fetch_detail(link, item_id):
+            async with CONCURRENCY.slot():
+                if tabs is not None:
+                    return await extract_property_info_tab(tabs, link, item_id, loop, executor)
+                return await loop.run_in_executor(executor, extract_property_info, link, item_id, pool)
+
+        async def scrape_item(link, item_id, page):
+            if state.seen(item_id):
+                return
+            try:
+                data = await RETRIES.call(fetch_detail, link, item_id)
+            except Exception as e:
+                print(f"Giving up on {link}: {e}")
+                METRICS.count('failed')
+                state.mark_failed(item_id, link, page)
+                return
+            data['page'] = page
+            await writer.put(data)
+            METRICS.count('scraped')
+
+        async def process_item(href, page):
+            await scrape_item(SITE.base_url + href, href.split('-')[-1], page)
+
+        def needs_detail(card):
+            if ENRICH == 'new':
+                return not state.seen(card['item_id'])
+            if ENRICH == 'changed':
+                return state.card_change(card['item_id'], SITE.cards.fingerprint(card)) is not None
+            return False
+
+        async def process_card(card, page):
+            if changelog is not None:
+                card['change'] = changelog.classify(card)
+                if card['change'] is None:
+                    return  # unchanged since the last crawl
+            card['page'] = page
+            card['source'] = 'card'
+            if changelog is not None or needs_detail(card):
+                try:
+                    data = await RETRIES.call(fetch_detail, card['url'], card['item_id'])
+                except Exception as e:
+                    print(f"Could not enrich {card['url']}: {e}")
+                    METRICS.count('enrich_failed')
+                    unenriched.add(card['item_id'])
+                    state.mark_failed(card['item_id'], card['url'], page)
+                else:
+                    # Card values are kept, so the fingerprint stored for this row matches the card next time
+                    card.update((column, value) for column, value in data.items() if column not in SITE.cards.columns)
+                    card['source'] = 'detail'
+            await writer.put(card)
+            METRICS.count('scraped' if card.get('source') == 'detail' else 'cards')
+
+        async def failed_items(_):
+            return state.failed_items(max_attempts=MAX_ITEM_ATTEMPTS)
+
+        async def retry_item(row, _):
+            await scrape_item(row['url'], row['item_id'], row['page'])
+
+        queue = WorkQueue(queue_path) if queue_path else None
+
+        def finish_page(page, items):
+            # Card crawls revisit every page each run; only detail crawls resume from finished pages
+            if not cards:
+                state.finish_page(page, items)
+            if queue is not None:
+                queue.ack(QUEUE_NAME, page)
+
+        crawled, empty = set(), set()
+
+        async def page_done(page, items):
+            crawled.add(page)
+            if not items:
+                empty.add(page)  # fetched, and past the last page of the index
+            await writer.after_flush(lambda: finish_page(page, items))
+
+        pipeline = Pipeline(fetch_cards if cards else fetch_page, process_card if cards else process_item,
+                            producers=INDEX_CONCURRENCY, consumers=MAX_CONCURRENCY,
+                            queue_size=ITEM_QUEUE_SIZE, on_page_done=page_done, metrics=METRICS)
+        async with http, writer, tabs or nullcontext():
+            if retry_failed:
+                await Pipeline(failed_items, retry_item, producers=1, consumers=MAX_CONCURRENCY,
+                               queue_size=ITEM_QUEUE_SIZE, metrics=METRICS).run(['failed'])
+            else:
+                # A card crawl revisits every page, not just the ones an earlier run left unfinished
+                pages = queue.leased(QUEUE_NAME) if queue else PAGES if cards else state.pending_pages(PAGES)
+                await pipeline.run(pages)
+                # Deletions can only be told from a single process that saw the whole index, up to its end;
+                # PAGES is a fixed window, and listings past it or on a page that failed have not gone anywhere
+                end = min(empty, default=None)
+                if changelog is not None and queue is None:
+                    complete = end is not None and not pipeline.failed_pages
+                    if complete and crawled.issuperset(page for page in PAGES if page < end):
+                        for row in changelog.deletions():
+                            await writer.put(row)
+                    else:
+                        print(f"[{SITE.name}] the crawl did not reach the end of the index or an index page failed; "
+                              f"no deletions reported")
+        if queue is not None:
+            queue.close()
+    if RECRAWL:
+        changelog.report()
+    CONCURRENCY.report()
+    RETRIES.report()
+    SUPERVISOR.report()
+    WAITS.report()
+    METRICS.stop()
+    if ARCHIVE_HTML:
+        ARCHIVE.report()
+        ARCHIVE.close()
+
+
+async def reparse():
+    """Rebuild the listing rows from the archive with the current extractors."""
+    async with make_writer(OUTPUT_FORMAT, "lalafo_reparsed", SITE.columns, normalize=NORMALIZE) as writer:
+        async for row in ARCHIVE.reparse(extract_listing):
+            await writer.put(row)
+    ARCHIVE.close()
+
+
+async def seed(queue):
+    with CrawlState(STATE_PATH, SITE.name) as state:
+        queue.enqueue(QUEUE_NAME, PAGES if INDEX_ONLY or RECRAWL else state.pending_pages(PAGES))
+    queue.seal(QUEUE_NAME)
+
+
+if __name__ == '__main__':
+    args = crawl_arguments("Scrape lalafo.az listings.").parse_args()
+    start_time = time.time()
+    run_crawl(main, args, seed=seed, reparse=reparse, queue_name=QUEUE_NAME)
+    end_time = time.time()
+    execution_time = end_time - start_time
+    print(f"Execution time: {execution_time} seconds")
@@ -0,0 +1 @@
+"""Shared building blocks for the bina.az, lalafo.az and tap.az scrapers."""
@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fetches (
+    id INTEGER PRIMARY KEY,
+    site TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    digest TEXT NOT NULL,
+    phone TEXT
+);
+CREATE INDEX IF NOT EXISTS fetches_item ON fetches (site, item_id, fetched_at);
+CREATE INDEX IF NOT EXISTS fetches_url ON fetches (url, fetched_at);
+CREATE INDEX IF NOT EXISTS fetches_time ON fetches (site, fetched_at);
+"""
+ENTRY_COLUMNS = ('item_id', 'url', 'fetched_at', 'phone', 'segment', 'offset', 'length')
+
+
+def read_blob(directory, segment, offset, length, decompressor=None):
+    if decompressor is None:
+        import zstandard
+        decompressor = zstandard.ZstdDecompressor()
+    with open(os.path.join(directory, segment), 'rb') as f:
+        f.seek(offset)
+        return decompressor.decompress(f.read(length)).decode('utf-8')
+
+
+def _extract_batch(directory, extract, entries):
+    """Worker side of `HtmlArchive.reparse`: read, decompress and extract a batch of entries."""
+    import zstandard
+    decompressor = zstandard.ZstdDecompressor()
+    rows, failures = [], []
+    for entry in entries:
+        try:
+            html = read_blob(directory, entry['segment'], entry['offset'], entry['length'], decompressor)
+            rows.append(extract(html, entry['url'], entry['item_id'], entry['phone']))
+        except Exception as e:
+            failures.append((entry['url'], repr(e)))
+    return rows, failures
+
+
+class HtmlArchive:
+    """Raw listing HTML kept on disk, so pages can be parsed again without fetching them.
+
+    Every page is stored once per distinct content (keyed by its SHA-256) as
+    a zstd frame appended to a segment file under `directory`; segments are
+    never rewritten, and each process appends to its own. An SQLite index
+    records every fetch by site, item id, URL and time. Nothing is opened
+    until the first use, in the process that uses it, so module-level
+    archives survive forked workers. `reparse(extract)` streams the latest
+    page of every listing through `extract` on all cores.
+    """
+
+    def __init__(self, directory, site, segment_bytes=256 * 1024 * 1024, level=3):
+        self.directory = directory
+        self.site = site
+        self.segment_bytes = segment_bytes
+        self.level = level
+        self.stored = 0
+        self.deduplicated = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = None
+        self._conn = None
+        self._segment = None
+        self._segments = 0
+        self._file = None
+
+    def _open(self):
+        if self._pid == os.getpid():
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(self.directory, 'index.sqlite'), timeout=60,
+                                     check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._segment, self._file = None, None
+        self._pid = os.getpid()
+
+    def _compress(self, data):
+        # Compressors are not thread-safe; each fetch thread gets its own.
+        compressor = getattr(self._local, 'compressor', None)
+        if compressor is None:
+            import zstandard
+            compressor = self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+        return compressor.compress(data)
+
+    def _append(self, frame):
+        if self._file is None or self._file.tell() >= self.segment_bytes:
+            if self._file is not None:
+                self._file.close()
+            self._segments += 1
+            self._segment = '%s-%d-%03d.zst' % (time.strftime('%Y%m%d%H%M%S'), os.getpid(), self._segments)
+            self._file = open(os.path.join(self.directory, self._segment), 'ab')
+        offset = self._file.tell()
+        self._file.write(frame)
+        # On disk before the index points at it.
+        self._file.flush()
+        return self._segment, offset
+
+    def put(self, item_id, url, html, phone=None, fetched_at=None):
+        """Archive one fetched page; returns its content digest."""
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self._open()
+            known = self._conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        frame = None if known else self._compress(data)
+        with self._lock, self._conn:
+            if frame is not None:
+                segment, offset = self._append(frame)
+                self._conn.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?, ?)",
+                                   (digest, segment, offset, len(frame), len(data)))
+                self.stored += 1
+            else:
+                self.deduplicated += 1
+            self._conn.execute(
+                "INSERT INTO fetches (site, item_id, url, fetched_at, digest, phone) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.site, str(item_id), url, fetched_at or time.time(), digest, phone))
+        return digest
+
+    def entries(self, item_id=None, url=None, since=None, until=None, latest=False):
+        """Archived fetches of this site, oldest first, optionally only the latest one per listing."""
+        where, params = ["f.site = ?"], [self.site]
+        for clause, value in (("f.item_id = ?", None if item_id is None else str(item_id)), ("f.url = ?", url),
+                              ("f.fetched_at >= ?", since), ("f.fetched_at < ?", until)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        if latest:
+            where.append("f.id IN (SELECT MAX(id) FROM fetches WHERE site = ? GROUP BY item_id)")
+            params.append(self.site)
+        with self._lock:
+            self._open()
+            rows = self._conn.execute(
+                "SELECT f.item_id, f.url, f.fetched_at, f.phone, b.segment, b.offset, b.length "
+                "FROM fetches f JOIN blobs b ON b.digest = f.digest "
+                f"WHERE {' AND '.join(where)} ORDER BY f.fetched_at, f.id", params).fetchall()
+        return [dict(zip(ENTRY_COLUMNS, row)) for row in rows]
+
+    def read(self, entry):
+        return read_blob(self.directory, entry['segment'], entry['offset'], entry['length'])
+
+    async def reparse(self, extract, processes=None, batch_size=200, **filters):
+        """Yield `extract(html, url, item_id, phone)` for the latest page of every archived listing.
+
+        Batches are read and parsed in `processes` worker processes (all
+        cores by default), in segment order so each worker reads sequentially.
+        `extract` must be a module-level function. Pages the extractor fails
+        on are counted and reported, not raised.
+        """
+        filters.setdefault('latest', True)
+        entries = await asyncio.to_thread(self.entries, **filters)
+        entries.sort(key=lambda entry: (entry['segment'], entry['offset']))
+        processes = processes or os.cpu_count() or 1
+        loop = asyncio.get_running_loop()
+        failures = []
+        starts = iter(range(0, len(entries), batch_size))
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            pending = set()
+            while True:
+                # Keep every worker busy without queueing the whole archive at once.
+                for start in starts:
+                    batch = entries[start:start + batch_size]
+                    pending.add(loop.run_in_executor(executor, _extract_batch, self.directory, extract, batch))
+                    if len(pending) >= processes * 2:
+                        break
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    rows, failed = future.result()
+                    failures.extend(failed)
+                    for row in rows:
+                        yield row
+        print(f"[{self.site}] reparsed {len(entries) - len(failures)} of {len(entries)} archived pages")
+        for url, error in failures[:10]:
+            print(f"  {url}: {error}")
+
+    def stats(self):
+        return {'stored': self.stored, 'deduplicated': self.deduplicated}
+
+    def report(self):
+        print(f"[{self.site}] archive: {self.stats()}")
+
+    def close(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            if self._file is not None:
+                self._file.close()
+            self._conn.close()
+            self._pid, self._conn, self._file = None, None, None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,280 @@
+"""Parser benchmark and golden-record check over the saved pages in fixtures/.
+
+    python -m scraping_core.bench                      # every site, every installed backend
+    python -m scraping_core.bench --site tapaz --backend lxml
+    python -m scraping_core.bench --save-baseline      # record this machine's throughput (untracked)
+    python -m scraping_core.bench --update-golden      # after an intended extraction change
+    python -m scraping_core.bench --from-archive html_archive --site bina --count 20
+
+Each site has `detail/<item_id>.html` listing pages, `index/*.html` grid
+pages and `golden.json`, the records the reference backend extracts from
+them. The run exits non-zero when a backend disagrees with a golden record
+or its throughput drops more than `--threshold` below the saved baseline.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from scraping_core.parsing import BACKENDS, get_backend
+from scraping_core.sites import SITES, get_site
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, 'fixtures')
+# Timings are machine-specific, so the baseline lives outside the tracked fixtures (and is git-ignored).
+BASELINE = os.path.join(ROOT, 'bench_baseline.json')
+REFERENCE_BACKEND = 'bs4'
+
+
+def _read_pages(directory):
+    if not os.path.isdir(directory):
+        return []
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.html'):
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                pages.append((name[:-len('.html')], f.read()))
+    return pages
+
+
+def load_corpus(site, root=FIXTURES):
+    """`(detail, index)` lists of `(name, html)` for one site; detail pages are named by item id."""
+    return _read_pages(os.path.join(root, site, 'detail')), _read_pages(os.path.join(root, site, 'index'))
+
+
+def detail_url(spec, item_id):
+    return f"{spec.base_url}/{item_id}"
+
+
+def extract_corpus(spec, backend, detail, index):
+    """What `backend` extracts from the corpus, in the layout of golden.json."""
+    return {
+        'detail': {item_id: spec.extract(html, detail_url(spec, item_id), item_id, backend)
+                   for item_id, html in detail},
+        'index': {name: spec.cards.extract(html, backend, spec.base_url + '/') for name, html in index},
+    }
+
+
+def compare(expected, actual):
+    """Human-readable differences between two extract_corpus results."""
+    problems = []
+    for kind in ('detail', 'index'):
+        for name in sorted(set(expected.get(kind, {})) | set(actual.get(kind, {}))):
+            want, got = expected.get(kind, {}).get(name), actual.get(kind, {}).get(name)
+            if want is None or got is None:
+                problems.append(f"{kind}/{name}: {'missing from golden' if want is None else 'not extracted'}")
+            elif kind == 'index' and len(want) != len(got):
+                problems.append(f"{kind}/{name}: {len(got)} cards, expected {len(want)}")
+            else:
+                for position, (row, golden) in enumerate(zip(got, want) if kind == 'index' else [(got, want)]):
+                    for column in golden:
+                        if row.get(column) != golden[column]:
+                            where = f"{kind}/{name}" + (f"[{position}]" if kind == 'index' else '')
+                            problems.append(f"{where}.{column}: {row.get(column)!r} != {golden[column]!r}")
+    return problems
+
+
+def _peak_memory_kb(spec, backend, detail):
+    """Largest RSS growth while one parsed listing is alive, C-level trees (lxml, selectolax) included."""
+    import psutil
+
+    process = psutil.Process()
+    before = process.memory_info().rss
+    peak = 0
+    for _, html in detail:
+        root = backend.parse(html)
+        spec.plan.collect(backend, root)
+        peak = max(peak, process.memory_info().rss - before)
+        del root
+    return peak // 1024
+
+
+def _time_detail(spec, backend, detail, repeat, clock=time.perf_counter):
+    """Per-page microseconds spent parsing, traversing and in each field's extractor."""
+    plan = spec.plan
+    parse = traverse = 0.0
+    fields = [0.0] * len(plan.fields)
+    for _ in range(repeat):
+        for _, html in detail:
+            start = clock()
+            root = backend.parse(html)
+            parsed = clock()
+            found = plan.collect(backend, root)
+            parse += parsed - start
+            traverse += clock() - parsed
+            for position, (field, nodes) in enumerate(zip(plan.fields, found)):
+                start = clock()
+                try:
+                    field.extract(backend, nodes)
+                except Exception:
+                    pass
+                fields[position] += clock() - start
+    pages = max(len(detail) * repeat, 1)
+    timings = {'parse': parse, 'traverse': traverse}
+    timings.update((field.name, spent) for field, spent in zip(plan.fields, fields))
+    return {name: round(spent / pages * 1e6, 1) for name, spent in timings.items()}
+
+
+def measure(site, backend_name, repeat, root=FIXTURES):
+    """Benchmark one backend on one site's corpus; meant to run in a fresh process, so memory is not shared."""
+    spec = get_site(site)
+    backend = get_backend(backend_name)
+    detail, index = load_corpus(site, root)
+    # Warm up (and let the backend build its caches) before anything is timed.
+    extract_corpus(spec, backend, detail, index)
+    result = {'site': site, 'backend': backend_name}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item_id, html in detail:
+            spec.extract(html, detail_url(spec, item_id), item_id, backend)
+    elapsed = time.perf_counter() - start
+    result['detail_pages_per_sec'] = round(len(detail) * repeat / elapsed, 1) if detail else None
+    start = time.perf_counter()
+    cards = 0
+    for _ in range(repeat):
+        for _, html in index:
+            cards += len(spec.cards.extract(html, backend, spec.base_url + '/'))
+    elapsed = time.perf_counter() - start
+    result['index_pages_per_sec'] = round(len(index) * repeat / elapsed, 1) if index else None
+    result['cards_per_sec'] = round(cards / elapsed) if index else None
+    result['peak_rss_kb'] = _peak_memory_kb(spec, backend, detail) if detail else None
+    result['detail_us'] = _time_detail(spec, backend, detail, repeat) if detail else {}
+    return result
+
+
+def installed_backends():
+    names = []
+    for name in BACKENDS:
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def load_golden(site, root=FIXTURES):
+    path = os.path.join(root, site, 'golden.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def import_archive(directory, site, count, root=FIXTURES):
+    """Copy the latest `count` archived listing pages of `site` into its corpus."""
+    from scraping_core.archive import HtmlArchive
+
+    with HtmlArchive(directory, site) as archive:
+        entries = archive.entries(latest=True)[-count:]
+        target = os.path.join(root, site, 'detail')
+        os.makedirs(target, exist_ok=True)
+        for entry in entries:
+            with open(os.path.join(target, entry['item_id'] + '.html'), 'w', encoding='utf-8') as f:
+                f.write(archive.read(entry))
+    print(f"[{site}] copied {len(entries)} archived pages into {target}; review them, then --update-golden")
+
+
+def report(result, baseline):
+    print(f"\n[{result['site']}] {result['backend']}: {result['detail_pages_per_sec']} detail pages/s, "
+          f"{result['index_pages_per_sec']} index pages/s ({result['cards_per_sec']} cards/s), "
+          f"peak RSS +{result['peak_rss_kb']} KB")
+    if baseline:
+        print(f"  baseline: {baseline.get('detail_pages_per_sec')} detail pages/s, "
+              f"{baseline.get('index_pages_per_sec')} index pages/s")
+    for name, micros in sorted(result['detail_us'].items(), key=lambda item: -item[1]):
+        print(f"  {name:<16} {micros:>10.1f} us/page")
+
+
+def regressions(result, baseline, threshold):
+    problems = []
+    for metric in ('detail_pages_per_sec', 'index_pages_per_sec'):
+        before, now = (baseline or {}).get(metric), result.get(metric)
+        if before and now is not None and now < before * (1 - threshold):
+            problems.append(f"[{result['site']}] {result['backend']} {metric}: {now} < {before} "
+                            f"(more than {threshold:.0%} below baseline)")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the HTML extractors on the saved page corpus.")
+    parser.add_argument('--site', action='append', choices=sorted(SITES), help="default: every site")
+    parser.add_argument('--backend', action='append', choices=list(BACKENDS), help="default: every installed one")
+    parser.add_argument('--repeat', type=int, default=20, help="passes over the corpus per measurement")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed throughput drop below the baseline before the run fails")
+    parser.add_argument('--fixtures', default=FIXTURES)
+    parser.add_argument('--baseline', default=BASELINE, help="throughput baseline of this machine")
+    parser.add_argument('--save-baseline', action='store_true', help="store this run's throughput as the baseline")
+    parser.add_argument('--update-golden', action='store_true',
+                        help=f"rewrite golden.json from the {REFERENCE_BACKEND} backend's output")
+    parser.add_argument('--from-archive', metavar='DIR', help="import listing pages from an HtmlArchive")
+    parser.add_argument('--count', type=int, default=20, help="pages per site to import with --from-archive")
+    args = parser.parse_args(argv)
+    sites = args.site or sorted(SITES)
+
+    if args.from_archive:
+        for site in sites:
+            import_archive(args.from_archive, site, args.count, args.fixtures)
+        return 0
+
+    if args.update_golden:
+        backend = get_backend(REFERENCE_BACKEND)
+        for site in sites:
+            spec = get_site(site)
+            golden = extract_corpus(spec, backend, *load_corpus(site, args.fixtures))
+            write_json(os.path.join(args.fixtures, site, 'golden.json'), golden)
+            print(f"[{site}] golden records written for {len(golden['detail'])} detail and "
+                  f"{len(golden['index'])} index pages")
+        return 0
+
+    backends = args.backend or installed_backends()
+    baseline_path = args.baseline
+    baselines = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path, encoding='utf-8') as f:
+            baselines = json.load(f)
+    problems = []
+    for site in sites:
+        golden = load_golden(site, args.fixtures)
+        if golden is None:
+            problems.append(f"[{site}] no golden.json; create it with --update-golden")
+        for backend in backends:
+            spec = get_site(site)
+            if golden is not None:
+                actual = extract_corpus(spec, get_backend(backend), *load_corpus(site, args.fixtures))
+                problems.extend(f"[{site}] {backend} {problem}" for problem in compare(golden, actual))
+            # A fresh process per measurement, so peak memory and caches are not shared between runs.
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                result = executor.submit(measure, site, backend, args.repeat, args.fixtures).result()
+            baseline = baselines.get(site, {}).get(backend)
+            report(result, baseline)
+            if args.save_baseline:
+                baselines.setdefault(site, {})[backend] = {
+                    'detail_pages_per_sec': result['detail_pages_per_sec'],
+                    'index_pages_per_sec': result['index_pages_per_sec'],
+                }
+            else:
+                problems.extend(regressions(result, baseline, args.threshold))
+    if args.save_baseline:
+        write_json(baseline_path, baselines)
+        print(f"\nBaseline saved to {baseline_path}")
+    if problems:
+        print("\nFAILED:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
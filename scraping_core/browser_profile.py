@@ -0,0 +1,93 @@
+from fnmatch import fnmatch
+
+from selenium.webdriver.chrome.options import Options
+
+# URL patterns (Chrome's `*` wildcards) for each resource type that can be blocked.
+RESOURCE_PATTERNS = {
+    'image': ('*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*'),
+    'font': ('*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'),
+    'media': ('*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*', '*.ogg*'),
+    'map': ('*maps.googleapis.com*', '*maps.gstatic.com*', '*api-maps.yandex.ru*', '*tile.openstreetmap.org*'),
+    'tracker': ('*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+                '*googlesyndication.com*', '*connect.facebook.net*', '*mc.yandex.ru*', '*hotjar.com*',
+                '*adservice.google.*', '*criteo.*', '*tiktok.com*'),
+}
+
+LEAN_ARGS = (
+    '--disable-gpu',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-dev-shm-usage',
+    '--no-first-run',
+    '--mute-audio',
+    '--blink-settings=imagesEnabled=false',
+)
+
+
+class BrowserProfile:
+    """A lean Chrome setup for listing pages: no images, fonts, media, maps or trackers.
+
+    `options()` builds the Chrome options (eager page loads, background
+    features off, a small window); `apply(driver)` installs the URL blocklist
+    on a started session through CDP. A block pattern is dropped when it
+    would match one of the site's `allow` patterns, so requests the scraper
+    depends on (e.g. the phone reveal) always go through. `blocks(url,
+    resource_type)` answers the same question per request, for drivers that
+    intercept requests themselves (the Playwright TabPool).
+    """
+
+    def __init__(self, block=('image', 'font', 'media', 'map', 'tracker'), block_urls=(), allow=(),
+                 page_load_strategy='eager', window_size=(1280, 800), headless=True, lean=True, extra_args=()):
+        self.block = tuple(block)
+        self.block_urls = tuple(block_urls)
+        self.allow = tuple(allow)
+        self.page_load_strategy = page_load_strategy
+        self.window_size = window_size
+        self.headless = headless
+        self.lean = lean
+        self.extra_args = tuple(extra_args)
+
+    def blocked_urls(self):
+        patterns = [pattern for kind in self.block for pattern in RESOURCE_PATTERNS[kind]]
+        patterns.extend(self.block_urls)
+        return [pattern for pattern in patterns
+                if not any(fnmatch(allowed, pattern) for allowed in self.allow)]
+
+    def blocks(self, url, resource_type=None):
+        if any(fnmatch(url, allowed) for allowed in self.allow):
+            return False
+        if resource_type in self.block:
+            return True
+        return any(fnmatch(url, pattern) for pattern in self.blocked_urls())
+
+    def arguments(self):
+        """Chrome command-line switches, without --headless."""
+        arguments = ['--window-size=%d,%d' % self.window_size]
+        if self.lean:
+            arguments.extend(argument for argument in LEAN_ARGS
+                             if 'image' in self.block or not argument.startswith('--blink-settings'))
+        arguments.extend(self.extra_args)
+        return arguments
+
+    def options(self):
+        chrome_options = Options()
+        if self.headless:
+            chrome_options.add_argument('--headless')
+        chrome_options.page_load_strategy = self.page_load_strategy
+        for argument in self.arguments():
+            chrome_options.add_argument(argument)
+        if 'image' in self.block:
+            chrome_options.add_experimental_option(
+                'prefs', {'profile.managed_default_content_settings.images': 2})
+        return chrome_options
+
+    def apply(self, driver):
+        patterns = self.blocked_urls()
+        if patterns:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        return driver
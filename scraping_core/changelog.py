@@ -0,0 +1,31 @@
+from collections import Counter
+
+
+class Changelog:
+    """Compares a recrawl's index cards with the fingerprints kept in the crawl state.
+
+    `classify(card)` returns 'insert', 'update' or None (unchanged) and
+    remembers the card as still listed. After a crawl that covered the whole
+    index, `deletions()` are the rows for listings that were not seen again.
+    """
+
+    def __init__(self, state, cards):
+        self.state = state
+        self.cards = cards
+        self.seen = set()
+        self.counts = Counter()
+
+    def classify(self, card):
+        item_id = str(card['item_id'])
+        self.seen.add(item_id)
+        change = self.state.card_change(item_id, self.cards.fingerprint(card))
+        self.counts[change or 'unchanged'] += 1
+        return change
+
+    def deletions(self):
+        gone = sorted(self.state.known_cards() - self.seen)
+        self.counts['delete'] += len(gone)
+        return [{'item_id': item_id, 'source': 'card', 'change': 'delete'} for item_id in gone]
+
+    def report(self):
+        print(f"[{self.state.site}] changes: {dict(self.counts)}")
@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from scraping_core.waits import LatencyTracker
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from aiohttp import ClientConnectionError
+except ImportError:
+    ClientConnectionError = ConnectionError
+
+# Statuses a site answers with when it is being pushed too hard
+OVERLOAD_STATUSES = (429, 503)
+
+
+def is_overload(exc):
+    """True for errors that mean the site is being pushed too hard; a missing element is not one."""
+    status = getattr(exc, 'status', None)
+    if status is not None:
+        return status in OVERLOAD_STATUSES
+    return isinstance(exc, (ConnectionError, ClientConnectionError))
+
+
+def memory_pressure(percent):
+    return psutil is not None and psutil.virtual_memory().percent >= percent
+
+
+class _Permit:
+    def __init__(self):
+        self.ok = True
+
+
+class AdaptiveLimiter:
+    """AIMD limit on a site's in-flight detail fetches.
+
+    The limit grows by one after every `limit` healthy fetches and is cut by
+    `backoff` when a fetch in a `slot()` fails with an overload error (HTTP
+    429/503, a refused or dropped connection), when the error rate passes
+    `max_error_rate`, when the median latency rises above `tolerance` times
+    the best median seen so far, or when host memory use reaches
+    `memory_percent`. Cuts are at most one per `cooldown` seconds so
+    a burst of failures from the same moment counts once. `on_change(limit)`
+    is called with every new limit, e.g. to resize the driver pool.
+    """
+
+    def __init__(self, site, initial=4, minimum=1, maximum=30, backoff=0.5, tolerance=2.0,
+                 max_error_rate=0.2, memory_percent=90, window=100, min_samples=20, cooldown=5.0,
+                 on_change=None):
+        self.site = site
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.max_error_rate = max_error_rate
+        self.memory_percent = memory_percent
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.on_change = on_change
+        self.in_flight = 0
+        self.increases = 0
+        self.decreases = 0
+        self._latency = LatencyTracker(window)
+        self._outcomes = deque(maxlen=window)
+        self._baseline = None
+        self._healthy = 0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._available = None
+
+    def _set_limit(self, limit):
+        self.limit = limit
+        if self.on_change is not None:
+            self.on_change(limit)
+
+    def _decrease(self, reason):
+        now = time.monotonic()
+        self._healthy = 0
+        if now - self._last_decrease < self.cooldown or self.limit <= self.minimum:
+            return
+        self._last_decrease = now
+        self.decreases += 1
+        limit = max(self.minimum, int(self.limit * self.backoff))
+        print(f"[{self.site}] concurrency {self.limit} -> {limit} ({reason})")
+        self._set_limit(limit)
+
+    def _increase(self):
+        self._healthy = 0
+        if self.limit >= self.maximum:
+            return
+        if memory_pressure(self.memory_percent):
+            self._decrease('memory pressure')
+            return
+        self.increases += 1
+        self._set_limit(self.limit + 1)
+
+    def record(self, seconds, ok=True):
+        """Feed back how long a fetch took and whether it produced a row."""
+        with self._lock:
+            self._outcomes.append(ok)
+            if not ok:
+                errors = self._outcomes.count(False)
+                if len(self._outcomes) >= self.min_samples and errors / len(self._outcomes) > self.max_error_rate:
+                    self._decrease(f"error rate {errors}/{len(self._outcomes)}")
+                return
+
+            self._latency.record(seconds)
+            if len(self._latency) >= self.min_samples:
+                median = self._latency.percentile(0.5)
+                # The baseline slowly forgets, so a site that got slower for good is not punished forever.
+                self._baseline = median if self._baseline is None else min(median, self._baseline * 1.001)
+                if median > self._baseline * self.tolerance:
+                    self._decrease(f"median latency {median:.2f}s")
+                    return
+            self._healthy += 1
+            if self._healthy >= self.limit:
+                self._increase()
+
+    def signal(self, exc):
+        """Back off if `exc` is an overload error; safe to call from worker threads."""
+        if is_overload(exc):
+            with self._lock:
+                self._decrease(type(exc).__name__)
+
+    async def acquire(self):
+        if self._available is None:
+            self._available = asyncio.Condition()
+        async with self._available:
+            await self._available.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._available:
+            self.in_flight -= 1
+            self._available.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one unit of concurrency; set `permit.ok = False` when the fetch failed."""
+        await self.acquire()
+        permit = _Permit()
+        start = time.monotonic()
+        try:
+            yield permit
+        except Exception as e:
+            permit.ok = False
+            self.signal(e)
+            raise
+        finally:
+            self.record(time.monotonic() - start, permit.ok)
+            await self.release()
+
+    def stats(self):
+        return {
+            'limit': self.limit,
+            'increases': self.increases,
+            'decreases': self.decreases,
+            'latency': self._latency.summary(),
+        }
+
+    def report(self):
+        print(f"[{self.site}] concurrency: {self.stats()}")
@@ -0,0 +1,133 @@
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    site TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    items INTEGER,
+    finished_at REAL,
+    PRIMARY KEY (site, page)
+);
+CREATE TABLE IF NOT EXISTS items (
+    site TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    url TEXT,
+    page INTEGER,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL,
+    PRIMARY KEY (site, item_id)
+);
+CREATE TABLE IF NOT EXISTS cards (
+    site TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    updated_at REAL,
+    PRIMARY KEY (site, item_id)
+);
+"""
+
+
+class CrawlState:
+    """Persistent record of a crawl so a restart resumes where it stopped.
+
+    Tracks finished index pages and the status of every item ('done' once its
+    row has been flushed to the output, 'failed' otherwise). Failed items
+    form the queue that `--retry-failed` drains in a later pass. The ids of
+    done items are kept in memory so the seen check costs nothing per
+    listing. The last written fingerprint of every index card tells the
+    index-only mode which listings changed.
+    """
+
+    def __init__(self, path, site):
+        self.path = path
+        self.site = site
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._done = {row[0] for row in self._conn.execute(
+            "SELECT item_id FROM items WHERE site = ? AND status = 'done'", (site,))}
+        self._finished_pages = {row[0] for row in self._conn.execute(
+            "SELECT page FROM pages WHERE site = ?", (site,))}
+        self._fingerprints = dict(self._conn.execute(
+            "SELECT item_id, fingerprint FROM cards WHERE site = ?", (site,)))
+
+    def pending_pages(self, pages):
+        """The pages of `pages` that were not finished by an earlier run."""
+        return [page for page in pages if page not in self._finished_pages]
+
+    def seen(self, item_id):
+        return str(item_id) in self._done
+
+    def finish_page(self, page, items):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                               (self.site, page, items, time.time()))
+        self._finished_pages.add(page)
+
+    def mark_items(self, rows, status):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO items (site, item_id, url, page, status, attempts, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 1, ?) "
+                "ON CONFLICT (site, item_id) DO UPDATE SET "
+                "status = excluded.status, attempts = items.attempts + 1, updated_at = excluded.updated_at",
+                [(self.site, str(row['item_id']), row.get('url'), row.get('page'), status, now) for row in rows])
+        if status == 'done':
+            self._done.update(str(row['item_id']) for row in rows)
+
+    def mark_done(self, rows):
+        self.mark_items(rows, 'done')
+
+    def mark_failed(self, item_id, url, page=None):
+        self.mark_items([{'item_id': item_id, 'url': url, 'page': page}], 'failed')
+
+    def card_change(self, item_id, fingerprint):
+        """'insert' for a card never written before, 'update' if it differs from the last one, else None."""
+        known = self._fingerprints.get(str(item_id))
+        if known is None:
+            return 'insert'
+        return 'update' if known != fingerprint else None
+
+    def known_cards(self):
+        return set(self._fingerprints)
+
+    def forget_cards(self, item_ids):
+        item_ids = [str(item_id) for item_id in item_ids]
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM cards WHERE site = ? AND item_id = ?",
+                                   [(self.site, item_id) for item_id in item_ids])
+        for item_id in item_ids:
+            self._fingerprints.pop(item_id, None)
+
+    def remember_cards(self, fingerprints):
+        """Store `(item_id, fingerprint)` pairs of cards whose rows were written."""
+        now = time.time()
+        rows = [(self.site, str(item_id), fingerprint, now) for item_id, fingerprint in fingerprints]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO cards VALUES (?, ?, ?, ?)", rows)
+        self._fingerprints.update((item_id, fingerprint) for _, item_id, fingerprint, _ in rows)
+
+    def failed_items(self, max_attempts=None):
+        """Items whose last attempt failed, oldest first, for a retry pass."""
+        query = "SELECT item_id, url, page FROM items WHERE site = ? AND status = 'failed'"
+        params = [self.site]
+        if max_attempts is not None:
+            query += " AND attempts < ?"
+            params.append(max_attempts)
+        rows = self._conn.execute(query + " ORDER BY updated_at", params).fetchall()
+        return [{'item_id': item_id, 'url': url, 'page': page} for item_id, url, page in rows]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,220 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from selenium import webdriver
+
+from scraping_core.drivers import chrome_service
+
+
+class _Slot:
+    def __init__(self):
+        self.driver = None
+        self.pages = 0
+
+
+class DriverPool:
+    """Fixed set of long-lived Chrome sessions checked out once per listing.
+
+    Sessions are started lazily, reset (cookies and storage cleared) when they
+    are returned, health-checked on checkout and recycled after `max_pages`.
+    `resize()` grows the pool at once and shrinks it as sessions come back.
+    `navigate()` loads a page through the optional per-domain `rate_limit`.
+    With a `supervisor` (a BrowserSupervisor) every session's process tree is
+    torn down with it; while the crawl is over its memory budget returned
+    sessions are recycled and checkouts wait for memory to be freed.
+    `on_start(driver)` is called for every new session, e.g. to install a
+    BrowserProfile's URL blocklist. `prewarm()` starts sessions up front so
+    the first listings do not wait for Chrome to boot. With `metrics`, the
+    checkout wait, Chrome startup, navigation and session reset are timed.
+    """
+
+    def __init__(self, size, options_factory, max_pages=50, rate_limit=None, supervisor=None, on_start=None,
+                 metrics=None):
+        self.size = size
+        self.options_factory = options_factory
+        self.max_pages = max_pages
+        self.rate_limit = rate_limit
+        self.supervisor = supervisor
+        self.on_start = on_start
+        self.metrics = metrics
+        self._busy = 0
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._surplus = 0
+        for _ in range(size):
+            self._idle.put(_Slot())
+
+    def _observe(self, stage, start):
+        if self.metrics is not None:
+            self.metrics.observe(stage, time.perf_counter() - start)
+
+    def _start(self, slot):
+        start = time.perf_counter()
+        launch = lambda: webdriver.Chrome(service=chrome_service(), options=self.options_factory())
+        slot.driver = launch() if self.supervisor is None else self.supervisor.launch(launch)
+        self._observe('driver_start', start)
+        slot.pages = 0
+        if self.on_start is not None:
+            self.on_start(slot.driver)
+
+    def _quit(self, slot):
+        driver, slot.driver = slot.driver, None
+        slot.pages = 0
+        if driver is None:
+            return
+        if self.supervisor is not None:
+            self.supervisor.quit(driver)
+            self.supervisor.reap()
+            return
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error quitting driver: {e}")
+
+    def _over_budget(self):
+        return self.supervisor is not None and self.supervisor.over_budget()
+
+    def _wait_for_memory(self, poll=1.0):
+        # Never wait while nothing is checked out: there would be nothing left to free memory.
+        while self._busy > 0 and self._over_budget():
+            time.sleep(poll)
+
+    def prewarm(self, count=None):
+        """Start up to `count` sessions (default: the whole pool) in parallel."""
+        slots = []
+        while count is None or len(slots) < count:
+            try:
+                slots.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+        def start(slot):
+            try:
+                if slot.driver is None:
+                    self._start(slot)
+            except Exception as e:
+                print(f"Could not pre-warm a driver: {e}")
+            finally:
+                self._idle.put(slot)
+
+        with ThreadPoolExecutor(max_workers=max(1, len(slots))) as executor:
+            list(executor.map(start, slots))
+        started = sum(slot.driver is not None for slot in slots)
+        print(f"Pre-warmed {started} of {len(slots)} drivers")
+        return started
+
+    def resize(self, size):
+        with self._lock:
+            grow = size - self.size
+            self.size = size
+            if grow < 0:
+                self._surplus -= grow
+                return
+            cancelled = min(grow, self._surplus)
+            self._surplus -= cancelled
+            grow -= cancelled
+        for _ in range(grow):
+            self._idle.put(_Slot())
+
+    def _retire(self):
+        with self._lock:
+            if self._surplus > 0:
+                self._surplus -= 1
+                return True
+            return False
+
+    @staticmethod
+    def _healthy(driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            # A dead chromedriver fails with urllib3 connection errors, not WebDriverException
+            return False
+
+    def _reset(self, driver):
+        start = time.perf_counter()
+        # Storage is per-origin, so clear it before leaving the listing page.
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        driver.get('about:blank')
+        self._observe('driver_reset', start)
+
+    def navigate(self, driver, url):
+        if self.rate_limit is not None:
+            self.rate_limit.wait_sync(url)
+        start = time.perf_counter()
+        driver.get(url)
+        self._observe('navigate', start)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        start = time.perf_counter()
+        self._wait_for_memory()
+        slot = self._idle.get(timeout=timeout)
+        self._observe('driver_checkout', start)
+        with self._lock:
+            self._busy += 1
+        try:
+            if slot.driver is None or not self._healthy(slot.driver):
+                self._quit(slot)
+                self._start(slot)
+            yield slot.driver
+        finally:
+            slot.pages += 1
+            with self._lock:
+                self._busy -= 1
+            retired = self._retire()
+            try:
+                over_budget = slot.driver is not None and self._over_budget()
+                if over_budget:
+                    self.supervisor.recycled += 1
+                if retired or over_budget or self._closed or slot.pages >= self.max_pages:
+                    self._quit(slot)
+                elif slot.driver is not None:
+                    try:
+                        self._reset(slot.driver)
+                    except Exception:
+                        self._quit(slot)
+            finally:
+                # Whatever went wrong above, the slot goes back; losing it would shrink the pool for good
+                if not retired:
+                    self._idle.put(slot)
+
+    def close(self):
+        # Sessions still checked out are quit when they are returned.
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                slot = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(slot)
+        if self.supervisor is not None:
+            self.supervisor.reap()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def render_page_source(pool, url, ready=None):
+    """Load `url` in a pooled session and return the rendered HTML.
+
+    `ready(driver)` is called after navigation to wait for the content that is
+    needed; its TimeoutException is raised, so a half-rendered page is never
+    mistaken for one without content.
+    """
+    with pool.driver() as driver:
+        pool.navigate(driver, url)
+        if ready is not None:
+            ready(driver)
+        return driver.page_source
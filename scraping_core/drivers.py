@@ -0,0 +1,70 @@
+"""Resolve the chromedriver binary once per process, from a cache that works offline.
+
+Provision the cache on a machine with network access and ship it with the
+workers (or point SCRAPER_DRIVER_CACHE at a shared directory):
+
+    python -m scraping_core.drivers
+"""
+import functools
+import os
+import shutil
+import sys
+import tempfile
+
+from selenium.webdriver.chrome.service import Service as ChromeService
+
+CACHE_DIR = os.environ.get('SCRAPER_DRIVER_CACHE',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'scraping', 'chromedriver'))
+DRIVER_NAME = 'chromedriver.exe' if sys.platform.startswith('win') else 'chromedriver'
+
+
+def cached_driver(cache_dir=CACHE_DIR):
+    path = os.path.join(cache_dir, DRIVER_NAME)
+    return path if os.access(path, os.X_OK) else None
+
+
+def provision(cache_dir=CACHE_DIR):
+    """Download the chromedriver matching the installed Chrome into `cache_dir`."""
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    downloaded = ChromeDriverManager().install()
+    os.makedirs(cache_dir, exist_ok=True)
+    # Copy next to the target and rename, so concurrent workers never see a half-written binary.
+    fd, tmp = tempfile.mkstemp(dir=cache_dir)
+    os.close(fd)
+    shutil.copy2(downloaded, tmp)
+    os.chmod(tmp, 0o755)
+    path = os.path.join(cache_dir, DRIVER_NAME)
+    os.replace(tmp, path)
+    return path
+
+
+@functools.lru_cache(maxsize=None)
+def chromedriver_path():
+    """CHROMEDRIVER_PATH, else the cached binary, else a fresh download into the cache.
+
+    Returns None when nothing could be resolved, leaving it to Selenium
+    Manager. The result is memoised, so a crawl resolves the driver once.
+    """
+    path = os.environ.get('CHROMEDRIVER_PATH')
+    if path:
+        return path
+    path = cached_driver()
+    if path:
+        return path
+    try:
+        return provision()
+    except Exception as e:
+        print(f"Could not provision chromedriver, falling back to {shutil.which(DRIVER_NAME) or 'Selenium Manager'}: {e}")
+        return shutil.which(DRIVER_NAME)
+
+
+def chrome_service():
+    path = chromedriver_path()
+    if path:
+        return ChromeService(path, log_path=os.devnull)
+    return ChromeService(log_path=os.devnull)
+
+
+if __name__ == '__main__':
+    print(provision())
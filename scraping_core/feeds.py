@@ -0,0 +1,131 @@
+import asyncio
+from urllib.parse import urljoin
+
+from selenium.common.exceptions import TimeoutException
+
+from scraping_core.parsing import ExtractionPlan, Field
+
+_NEW_LINKS_JS = """
+const links = document.querySelectorAll(arguments[0] + ':not([data-scraper-seen])');
+const hrefs = [];
+for (const link of links) {
+    link.setAttribute('data-scraper-seen', '1');
+    hrefs.push(link.getAttribute('href'));
+}
+return hrefs;
+"""
+
+_UNSEEN_COUNT_JS = "return document.querySelectorAll(arguments[0] + ':not([data-scraper-seen])').length"
+
+
+class _Feed:
+    def __init__(self, target, patience):
+        self.target = target
+        self.patience = patience
+        self.found = 0
+        self.done = False
+        self._stalls = 0
+        self._seen = set()
+
+    def steps(self):
+        """Step numbers for as long as the feed keeps producing; ends once it is done."""
+        step = 0
+        while not self.done:
+            yield step
+            step += 1
+
+    def _accept(self, hrefs):
+        new = []
+        for href in hrefs:
+            if href and href not in self._seen and self.found + len(new) < self.target:
+                self._seen.add(href)
+                new.append(href)
+        self.found += len(new)
+        self._stalls = 0 if new else self._stalls + 1
+        if self.found >= self.target or self._stalls >= self.patience:
+            self.done = True
+        return new
+
+
+class ScrollFeed(_Feed):
+    """Infinite-scroll discovery that only reads the links added since the last step.
+
+    Links already handed out are tagged in the DOM, so a step never
+    serialises or reparses the whole page. A scroll waits until new links
+    show up or the network has been idle for `settle` seconds, so a scroll
+    that loads nothing costs that long rather than the full wait timeout.
+    The feed is done once `target` links were found or `patience` scrolls in
+    a row added nothing.
+    """
+
+    def __init__(self, driver, link_css, waiter, target=5000, patience=3, settle=1.0):
+        super().__init__(target, patience)
+        self.driver = driver
+        self.link_css = link_css
+        self.waiter = waiter
+        self.settle = settle
+        self._scrolled = False
+
+    def step(self):
+        try:
+            return self._step()
+        except Exception:
+            self._accept([])
+            raise
+
+    def _step(self):
+        if self._scrolled:
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            settled = self.waiter.network_idle(self.settle)
+            try:
+                self.waiter.wait_until(
+                    self.driver, lambda d: d.execute_script(_UNSEEN_COUNT_JS, self.link_css) > 0 or settled(d),
+                    key='feed-scroll')
+            except TimeoutException:
+                pass
+        self._scrolled = True
+        return self._accept(self.driver.execute_script(_NEW_LINKS_JS, self.link_css))
+
+
+class HttpFeed(_Feed):
+    """Follows the feed's server-side pagination (`next_css`) without a browser.
+
+    With `cards` (a CardSpec) `step()` returns the card records of the new
+    links instead of their hrefs. Pages are parsed in `executor` (the
+    default one if None), off the event loop.
+    """
+
+    def __init__(self, http, start_url, link_css, next_css, backend, target=5000, patience=3, cards=None,
+                 executor=None):
+        super().__init__(target, patience)
+        self.http = http
+        self.cards = cards
+        self.executor = executor
+        self.next_url = start_url
+        self.backend = backend
+        self.plan = ExtractionPlan([
+            Field('links', link_css, lambda backend, nodes: [backend.attr(node, 'href') for node in nodes], many=True),
+            Field('next', next_css, lambda backend, nodes: backend.attr(nodes[0], 'href') if nodes else None),
+        ])
+
+    def _parse(self, html, url):
+        cards = self.cards.extract(html, self.backend, url) if self.cards is not None else None
+        return self.plan.extract(html, self.backend), cards
+
+    async def step(self):
+        url = self.next_url
+        try:
+            html = await self.http.get_text(url)
+        except Exception:
+            self._accept([])  # a failing page counts as a stall so the feed cannot retry forever
+            raise
+        values, cards = await asyncio.get_running_loop().run_in_executor(self.executor, self._parse, html, url)
+        new = self._accept(values['links'] or [])
+        if cards is not None:
+            fresh = {urljoin(url, href) for href in new}
+            new = [card for card in cards if card['url'] in fresh]
+        if values['next']:
+            self.next_url = urljoin(url, values['next'])
+        else:
+            self.done = True
+        return new
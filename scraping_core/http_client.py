@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import aiohttp
+
+try:
+    import brotli  # noqa: F401  aiohttp decodes br responses when it is installed
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                  '(KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'az,en;q=0.8,ru;q=0.6',
+    'Accept-Encoding': ACCEPT_ENCODING,
+}
+
+
+class HttpClient:
+    """Shared aiohttp session for pages that do not need a browser.
+
+    Connections are kept alive and reused across requests; `per_host` caps the
+    number of concurrent connections opened to any single host. With a
+    `rate_limit` (a DomainLimiter) every request first waits for its host's
+    token bucket. With `metrics`, request durations are recorded under the
+    `http_request` stage and responses counted by status.
+    """
+
+    def __init__(self, per_host=8, total=100, timeout=30, headers=None, rate_limit=None, metrics=None):
+        self.per_host = per_host
+        self.total = total
+        self.timeout = timeout
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self.rate_limit = rate_limit
+        self.metrics = metrics
+        self._session = None
+
+    def _trace_configs(self):
+        if self.rate_limit is None and self.metrics is None:
+            return []
+        trace = aiohttp.TraceConfig()
+
+        if self.rate_limit is not None:
+            async def throttle(session, context, params):
+                await self.rate_limit.wait(params.url)
+
+            trace.on_request_start.append(throttle)
+
+        if self.metrics is not None:
+            # Started after the rate limiter, so only time on the wire is recorded.
+            async def started(session, context, params):
+                context.started = time.perf_counter()
+
+            async def ended(session, context, params):
+                self.metrics.observe('http_request', time.perf_counter() - context.started)
+                self.metrics.count(f'http_{params.response.status}')
+
+            async def failed(session, context, params):
+                self.metrics.count('http_errors')
+
+            trace.on_request_start.append(started)
+            trace.on_request_end.append(ended)
+            trace.on_request_exception.append(failed)
+        return [trace]
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.total, limit_per_host=self.per_host,
+                                         keepalive_timeout=60, ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                              timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                              trace_configs=self._trace_configs())
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+        # Give the connector a moment to close its SSL transports cleanly.
+        await asyncio.sleep(0.25)
+
+    @property
+    def session(self):
+        return self._session
+
+    def isolated(self):
+        """New session with its own cookie jar that reuses the pooled connections."""
+        return aiohttp.ClientSession(connector=self._session.connector, connector_owner=False,
+                                     headers=self.headers, cookie_jar=aiohttp.CookieJar(),
+                                     timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                     trace_configs=self._trace_configs())
+
+    async def get_text(self, url, **kwargs):
+        async with self._session.get(url, **kwargs) as response:
+            response.raise_for_status()
+            return await response.text()
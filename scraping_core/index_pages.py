@@ -0,0 +1,56 @@
+import asyncio
+
+from selenium.common.exceptions import TimeoutException
+
+from scraping_core.driver_pool import render_page_source
+from scraping_core.parsing import Selector
+
+
+async def fetch_index_page(url, extract, http=None, pool=None, executor=None, ready=None):
+    """Return `extract(html)` for an index page: its listing links, cards, ...
+
+    `extract` runs in `executor`, so parsing a large page never stalls the
+    other requests on the event loop.
+
+    The page is fetched over plain HTTP first; Chrome is only used when
+    nothing could be extracted from the server-rendered HTML. HTTP errors
+    are raised for the caller's Retrier to classify: rendering the page in
+    Chrome would only send more traffic to a site that is throttling us.
+    An empty result means the page was fetched and holds no listings; a
+    render that times out is raised, unless the server HTML was empty too.
+    """
+    loop = asyncio.get_running_loop()
+    if http is not None:
+        html = await http.get_text(url)
+        found = await loop.run_in_executor(executor, extract, html)
+        if found or pool is None:
+            return found
+        print(f"No listings in server-rendered HTML of {url}, rendering in Chrome")
+    if pool is None:
+        return []
+    try:
+        html = await loop.run_in_executor(executor, render_page_source, pool, url, ready)
+    except TimeoutException:
+        if http is None:
+            raise
+        # The server answered without listings and none rendered either: past the end of the index
+        return []
+    return await loop.run_in_executor(executor, extract, html)
+
+
+def find_links(html, backend, item_css, link_css='a'):
+    """The href of the first `link_css` in (or of) every `item_css` node of a page."""
+    item, link = Selector(item_css), Selector(link_css)
+    hrefs = []
+    for node in item.select(backend, backend.parse(html)):
+        anchor = node if link.matches(backend, node) else link.select_one(backend, node)
+        href = backend.attr(anchor, 'href') if anchor is not None else None
+        if href:
+            hrefs.append(href)
+    return hrefs
+
+
+async def fetch_index_links(url, item_css, backend, link_css='a', http=None, pool=None, executor=None, ready=None):
+    """Return the hrefs of the listings (`item_css`, linked by `link_css`) on an index page."""
+    return await fetch_index_page(url, lambda html: find_links(html, backend, item_css, link_css),
+                                  http=http, pool=pool, executor=executor, ready=ready)
@@ -0,0 +1,145 @@
+"""End-to-end crawl benchmark against the local mock marketplace.
+
+    python -m scraping_core.load_test bina --duration 120 --latency 0.1 --throttle-rate 0.02
+
+starts scraping_core.mock_site in its own process, runs the site's scraper
+script against it in a scratch directory (so the real crawl state and output
+are untouched), and reports listings written per minute, the scraper's CPU
+time and its peak RSS including the browsers it started. Mock site options
+(latency, error and throttle rates, ...) are passed through. The script's own
+settings, RATE_LIMIT included, apply unchanged.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import psutil
+
+from scraping_core import mock_site
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = {'bina': 'bina_scraping.py', 'lalafo': 'lalafo_scraping.py', 'tapaz': 'tapaz_scraping.py'}
+# Output file stems; worker N of a --processes run writes <stem>.N.csv
+OUTPUTS = {'bina': 'final_df', 'lalafo': 'lalafo', 'tapaz': 'tapaz'}
+
+
+def count_rows(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path, newline='', encoding='utf-8') as f:
+        return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+
+
+def output_files(workdir, stem):
+    """The crawl's CSV output: `<stem>.csv`, or one `<stem>.N.csv` per worker process."""
+    return glob.glob(os.path.join(workdir, stem + '.csv')) + glob.glob(os.path.join(workdir, stem + '.[0-9]*.csv'))
+
+
+def start_server(args, port):
+    command = [sys.executable, '-m', 'scraping_core.mock_site', '--site', args.site, '--port', str(port)]
+    for name, value in mock_site.options(args).items():
+        command += ['--' + name.replace('_', '-'), str(value)]
+    server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    line = server.stdout.readline()  # "export <SITE>_BASE_URL=<url>" once it listens
+    if not line.startswith('export '):
+        server.kill()
+        raise RuntimeError("The mock site did not start")
+    return server, line.split('=', 1)[1].strip()
+
+
+class Sampler:
+    """CPU seconds and peak RSS of a process and everything it started."""
+
+    def __init__(self, pid):
+        self.root = psutil.Process(pid)
+        self.cpu = {}
+        self.peak_rss = 0
+
+    def sample(self):
+        try:
+            processes = [self.root] + self.root.children(recursive=True)
+        except psutil.Error:
+            return
+        rss = 0
+        for proc in processes:
+            try:
+                times = proc.cpu_times()
+                rss += proc.memory_info().rss
+            except psutil.Error:
+                continue
+            # Processes that exited keep their last sample.
+            self.cpu[proc.pid] = times.user + times.system
+        self.peak_rss = max(self.peak_rss, rss)
+
+    @property
+    def cpu_seconds(self):
+        return sum(self.cpu.values())
+
+
+def run(args):
+    server, base_url = start_server(args, args.port)
+    workdir = tempfile.mkdtemp(prefix=f'load-test-{args.site}-')
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''),
+               **{mock_site.base_url_variable(args.site): base_url})
+    command = [sys.executable, os.path.join(ROOT, SCRIPTS[args.site])] + args.scraper_args
+    output = None if args.verbose else subprocess.DEVNULL
+    print(f"Crawling {base_url} for at most {args.duration}s in {workdir}")
+    try:
+        started = time.monotonic()
+        scraper = subprocess.Popen(command, cwd=workdir, env=env, stdout=output, stderr=output)
+        sampler = Sampler(scraper.pid)
+        while scraper.poll() is None and time.monotonic() - started < args.duration:
+            sampler.sample()
+            time.sleep(args.interval)
+        if scraper.poll() is None:
+            # Interrupted like a user would; the writer flushes what it has on the way out.
+            scraper.send_signal(signal.SIGINT)
+            try:
+                scraper.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                scraper.kill()
+                scraper.wait()
+        elapsed = time.monotonic() - started
+        with urllib.request.urlopen(base_url + '/__stats') as response:
+            served = json.load(response)
+    finally:
+        server.terminate()
+        server.wait()
+    listings = sum(count_rows(path) for path in output_files(workdir, OUTPUTS[args.site]))
+    return {
+        'site': args.site,
+        'seconds': round(elapsed, 1),
+        'listings': listings,
+        'listings_per_minute': round(listings / elapsed * 60, 1),
+        'cpu_seconds': round(sampler.cpu_seconds, 1),
+        'cpu_percent': round(sampler.cpu_seconds / elapsed * 100, 1),
+        'peak_rss_mb': round(sampler.peak_rss / 1024 / 1024, 1),
+        'server': served,
+        'exit_code': scraper.returncode,
+        'workdir': workdir,
+    }
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description="Benchmark a scraper end to end against the local mock marketplace.")
+    parser.add_argument('site', choices=sorted(SCRIPTS))
+    mock_site.add_options(parser)
+    parser.add_argument('--duration', type=float, default=300, help="stop the crawl after this many seconds")
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between CPU/RSS samples")
+    parser.add_argument('--verbose', action='store_true', help="show the scraper's output")
+    parser.add_argument('--scraper-arg', action='append', default=[], dest='scraper_args',
+                        help="passed on to the scraper script, e.g. --scraper-arg=--processes=4")
+    return parser
+
+
+if __name__ == '__main__':
+    result = run(arguments().parse_args())
+    print(json.dumps(result, indent=1, ensure_ascii=False))
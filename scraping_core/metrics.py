@@ -0,0 +1,223 @@
+import bisect
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds, in seconds, of the stage duration histogram buckets.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float('inf'))
+
+
+class Histogram:
+    """Counts of durations per bucket, with their sum; cheap enough to record every call."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the `q` quantile."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total': round(self.total, 3),
+            'mean': round(self.total / self.count, 4) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+        }
+
+
+class _Span:
+    """Times the block it guards, in a `with` or an `async with`."""
+
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, *exc):
+        self.__exit__()
+
+
+class Metrics:
+    """Stage timings, event counters and live gauges of one site's crawl.
+
+    `span(stage)` times a block into that stage's histogram, `count(event)`
+    bumps a counter and `gauge(name, read)` registers a callable sampled on
+    every snapshot (queue depth, requests in flight, ...). `start(port,
+    log_interval)` serves the numbers on http://127.0.0.1:<port>/metrics
+    (Prometheus text; /metrics.json for JSON) and logs a JSON summary line
+    every `log_interval` seconds. Safe to use from threads and the event loop.
+    """
+
+    def __init__(self, site):
+        self.site = site
+        self.started = time.time()
+        self._stages = {}
+        self._counters = Counter()
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._stop = threading.Event()
+        self._logger = None
+        self._last_log = (time.monotonic(), Counter())
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def span(self, stage):
+        return _Span(self, stage)
+
+    def count(self, event, n=1):
+        with self._lock:
+            self._counters[event] += n
+
+    def gauge(self, name, read):
+        with self._lock:
+            self._gauges[name] = read
+
+    def _read_gauges(self):
+        with self._lock:
+            gauges = dict(self._gauges)
+        values = {}
+        for name, read in gauges.items():
+            try:
+                values[name] = read()
+            except Exception:
+                values[name] = None
+        return values
+
+    def snapshot(self):
+        with self._lock:
+            stages = {stage: histogram.summary() for stage, histogram in self._stages.items()}
+            counters = dict(self._counters)
+        return {
+            'site': self.site,
+            'uptime': round(time.time() - self.started, 1),
+            'counters': counters,
+            'gauges': self._read_gauges(),
+            'stages': stages,
+        }
+
+    def prometheus(self):
+        site = json.dumps(self.site)
+        lines = ['# TYPE scraper_events_total counter']
+        with self._lock:
+            counters = dict(self._counters)
+            stages = {stage: (histogram.buckets, list(histogram.counts), histogram.count, histogram.total)
+                      for stage, histogram in self._stages.items()}
+        for event, value in sorted(counters.items()):
+            lines.append(f'scraper_events_total{{site={site},event={json.dumps(event)}}} {value}')
+        lines.append('# TYPE scraper_stage_seconds histogram')
+        for stage, (buckets, counts, count, total) in sorted(stages.items()):
+            labels = f'site={site},stage={json.dumps(stage)}'
+            cumulative = 0
+            for bound, bucket in zip(buckets, counts):
+                cumulative += bucket
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'scraper_stage_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'scraper_stage_seconds_sum{{{labels}}} {total}')
+            lines.append(f'scraper_stage_seconds_count{{{labels}}} {count}')
+        for name, value in sorted(self._read_gauges().items()):
+            if value is not None:
+                lines.append(f'# TYPE scraper_{name} gauge')
+                lines.append(f'scraper_{name}{{site={site}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port, host='127.0.0.1'):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = metrics.prometheus(), 'text/plain; version=0.0.4'
+                elif self.path in ('/', '/metrics.json'):
+                    body, content_type = json.dumps(metrics.snapshot()), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"[{self.site}] metrics endpoint not started on port {port}: {e}")
+            return None
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"[{self.site}] metrics on http://{host}:{port}/metrics")
+        return self._server
+
+    def log(self):
+        """Print one structured summary line, with event rates since the previous one."""
+        snapshot = self.snapshot()
+        now = time.monotonic()
+        last, previous = self._last_log
+        elapsed = max(now - last, 1e-9)
+        counters = Counter(snapshot['counters'])
+        snapshot['per_minute'] = {event: round((counters[event] - previous[event]) / elapsed * 60, 1)
+                                  for event in counters}
+        snapshot['stages'] = {stage: {key: summary[key] for key in ('count', 'mean', 'p95')}
+                              for stage, summary in snapshot['stages'].items()}
+        self._last_log = (now, counters)
+        print(json.dumps(dict({'event': 'metrics', 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}, **snapshot),
+                         ensure_ascii=False), flush=True)
+
+    def _log_periodically(self, interval):
+        while not self._stop.wait(interval):
+            self.log()
+
+    def start(self, port=None, log_interval=60):
+        if port:
+            self.serve(port)
+        if log_interval:
+            self._stop.clear()
+            self._logger = threading.Thread(target=self._log_periodically, args=(log_interval,), daemon=True)
+            self._logger.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.log()
@@ -0,0 +1,361 @@
+"""Local stand-ins for bina.az, lalafo.az and tap.az, for crawling without the real sites.
+
+    python -m scraping_core.mock_site --latency 0.1 --error-rate 0.02 --throttle-rate 0.01
+
+serves the three sites on consecutive ports and prints the *_BASE_URL
+variables that point the scrapers at them. Listings are generated from their
+item id, so every run sees the same marketplace. `/__stats` on each port
+returns the request and fault counters as JSON.
+"""
+import argparse
+import asyncio
+import random
+from collections import Counter
+
+from aiohttp import web
+
+SITE_NAMES = ('bina', 'lalafo', 'tapaz')
+AREAS = ('Nəsimi r.', 'Yasamal r.', 'Xətai r.', 'Binəqədi r.', 'Səbail r.', 'Nərimanov r.')
+NAMES = ('Elvin', 'Günel', 'Rəşad', 'Aynur', 'Orxan', 'Leyla', 'Tural', 'Nigar')
+WORDS = ('təmirli mənzil metroya yaxın sənədləri qaydasındadır mebelli əşyalı kupçalı ipoteka '
+         'mümkündür günəşli tərəf həyət sakit məhəllə məktəb bağça market').split()
+
+# Clicking `button` fetches the phones and renders them into `target`, like the real reveal buttons.
+_REVEAL_JS = """<script>
+document.querySelector('%(button)s').addEventListener('click', function () {
+  fetch('%(url)s', {method: '%(method)s', headers: {'X-Requested-With': 'XMLHttpRequest'}})
+    .then(function (response) { return response.json(); })
+    .then(function (data) {
+      document.querySelector('%(target)s').innerHTML = data.phones.map(function (phone) {
+        return '%(item)s'.replace(/PHONE/g, phone);
+      }).join('');
+    });
+});
+</script>"""
+
+# Infinite scroll: reaching the bottom appends the cards of the next feed page.
+_SCROLL_JS = """<script>
+var next = document.querySelector('a[rel=next]');
+next = next && next.getAttribute('href');
+var loading = false;
+window.addEventListener('scroll', function () {
+  if (loading || !next || window.innerHeight + window.scrollY < document.body.scrollHeight - 200) return;
+  loading = true;
+  fetch(next).then(function (response) { return response.text(); }).then(function (html) {
+    var doc = new DOMParser().parseFromString(html, 'text/html');
+    var grid = document.querySelector('div.products');
+    doc.querySelectorAll('div.products-i').forEach(function (card) { grid.appendChild(card); });
+    var link = doc.querySelector('a[rel=next]');
+    next = link && link.getAttribute('href');
+    loading = false;
+  });
+});
+</script>"""
+
+
+class Listing:
+    """The deterministic content of one listing."""
+
+    def __init__(self, item_id):
+        rng = random.Random(item_id)
+        self.item_id = item_id
+        self.rooms = rng.randint(1, 5)
+        self.area = rng.randint(35, 180)
+        self.floor = rng.randint(1, 9)
+        self.floors = rng.randint(9, 16)
+        self.price = f'{rng.randint(45, 480)} {rng.randint(0, 999):03d}'
+        self.district = rng.choice(AREAS)
+        self.owner = rng.choice(NAMES)
+        self.phone = f'(050) {rng.randint(200, 999)}-{rng.randint(10, 99)}-{rng.randint(10, 99)}'
+        self.day = f'{rng.randint(1, 28)} oktyabr 2026'
+        self.views = rng.randint(20, 9000)
+        self.latitude = f'40.{rng.randint(350000, 420000)}'
+        self.longitude = f'49.{rng.randint(800000, 900000)}'
+        self.title = f'{self.rooms}-otaqlı mənzil, {self.area} m², {self.district}'
+        self.paragraphs = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + '.'
+                           for _ in range(rng.randint(2, 5))]
+
+    def properties(self):
+        return [('Kateqoriya', 'Köhnə tikili'), ('Mərtəbə', f'{self.floor} / {self.floors}'),
+                ('Sahə', f'{self.area} m²'), ('Otaq sayı', str(self.rooms))]
+
+
+def _page(title, body):
+    navigation = ''.join(f'<li class="nav-i"><a class="nav-link" href="/c/{i}">Kateqoriya {i}</a></li>'
+                         for i in range(40))
+    footer = ''.join(f'<a class="footer-link" href="/p/{i}">Səhifə {i}</a>' for i in range(60))
+    return (f'<!DOCTYPE html><html lang="az"><head><meta charset="utf-8"><title>{title}</title>'
+            f'<meta name="csrf-token" content="mock-token"></head><body>'
+            f'<header class="header"><ul class="nav">{navigation}</ul></header>{body}'
+            f'<footer class="footer">{footer}</footer></body></html>')
+
+
+def _properties(listing):
+    return ''.join(f'<div class="product-properties__i"><label class="product-properties__i-name">{name}</label>'
+                   f'<span class="product-properties__i-value">{value}</span></div>'
+                   for name, value in listing.properties())
+
+
+def _description(listing):
+    return ''.join(f'<p>{paragraph}</p>' for paragraph in listing.paragraphs)
+
+
+def _reveal(button, url, target, item, method='GET'):
+    return _REVEAL_JS % {'button': button, 'url': url, 'target': target, 'item': item, 'method': method}
+
+
+class Bina:
+    index_path = '/alqi-satqi'
+    first_id = 3000000
+
+    def card(self, listing):
+        return (f'<div class="items-i"><a class="item_link" href="/items/{listing.item_id}"></a>'
+                f'<div class="card_params"><div class="price"><span class="price-val">{listing.price}</span>'
+                f'<span class="price-cur">AZN</span></div><div class="location">{listing.district}</div>'
+                f'<ul class="name"><li>{listing.rooms}-otaqlı</li><li>{listing.area} m²</li>'
+                f'<li>{listing.floor}/{listing.floors} mərtəbə</li></ul>'
+                f'<div class="city_when">Bakı, {listing.day}</div></div></div>')
+
+    def index(self, cards, page, last):
+        return _page('Alqı-satqı', f'<div class="items-list">{cards}</div>')
+
+    def detail(self, listing):
+        return _page(listing.title, (
+            f'<h1 class="product-title">{listing.title}</h1>'
+            f'<div class="product-price"><div class="product-price__i product-price__i--bold">'
+            f'<span class="price-val">{listing.price}</span><span class="price-cur">AZN</span></div></div>'
+            f'<div class="product-properties">{_properties(listing)}</div>'
+            f'<div class="product-description"><div class="product-description__content">{_description(listing)}</div></div>'
+            f'<div id="item_map" data-lat="{listing.latitude}" data-lng="{listing.longitude}"></div>'
+            f'<div class="product-owner"><div class="product-owner__info-name">{listing.owner}</div>'
+            f'<div class="product-owner__info-region">mülkiyyətçi</div>'
+            f'<div class="product-phones__btn"><span class="product-phones__btn-value">Nömrəni göstər</span></div>'
+            f'<div class="product-phones__list"></div></div>'
+            f'<div class="product-statistics"><span class="product-statistics__i-text">Yeniləndi: {listing.day}</span>'
+            f'<span class="product-statistics__i-text">Baxışların sayı: {listing.views}</span></div>'
+            + _reveal('.product-phones__btn-value', f'/items/{listing.item_id}/phones', '.product-phones__list',
+                      '<div class="product-phones__list-i"><a href="tel:PHONE">PHONE</a></div>')))
+
+    def routes(self, server):
+        return [web.get(self.index_path, server.index), web.get('/items/{item_id:\\d+}', server.detail),
+                web.get('/items/{item_id:\\d+}/phones', server.phones)]
+
+
+class Lalafo:
+    index_path = '/'
+    first_id = 100000000
+
+    def card(self, listing):
+        return (f'<div class="lf-ad-tile"><a class="lf-ad-tile__link" '
+                f'href="/baku/ads/satilir-menzil-id-{listing.item_id}"></a>'
+                f'<p class="lf-ad-tile__price">{listing.price} AZN</p><p class="lf-ad-tile__title">{listing.title}</p>'
+                f'<p class="lf-ad-tile__city">Bakı</p><p class="lf-ad-tile__date">{listing.day}</p></div>')
+
+    def index(self, cards, page, last):
+        return _page('Lalafo', f'<div class="listing">{cards}</div>')
+
+    def detail(self, listing):
+        params = ''.join(f'<li><p>{name}:</p><a href="/f/{i}">{value}</a></li>'
+                         for i, (name, value) in enumerate(listing.properties()))
+        return _page(listing.title, (
+            f'<h1 class="ad-detail-title">{listing.title}</h1><p class="LFHeading">{listing.price} AZN</p>'
+            f'<ul class="details-page__params">{params}</ul>'
+            f'<div class="description__wrap"><span>{" ".join(listing.paragraphs)}</span></div>'
+            f'<span class="userName-text">{listing.owner}</span>'
+            f'<button class="show-button">Nömrəni göstər</button><div class="phone-number__wrap"></div>'
+            f'<div class="about-ad-info__date"><span>Yaradılıb:</span><span>{listing.day}</span></div>'
+            f'<div class="about-ad-info__date"><span>Yenilənib:</span><span>{listing.day}</span></div>'
+            f'<div class="impressions"><span>{listing.views}</span></div>'
+            + _reveal('.show-button', f'/api/phones/{listing.item_id}', '.phone-number__wrap',
+                      '<a class="phone-item" href="tel:PHONE">PHONE</a>')))
+
+    def routes(self, server):
+        return [web.get(self.index_path, server.index),
+                web.get('/baku/ads/{slug:[^/]+}-id-{item_id:\\d+}', server.detail),
+                web.get('/api/phones/{item_id:\\d+}', server.phones)]
+
+
+class Tapaz:
+    index_path = '/elanlar'
+    first_id = 38000000
+
+    def card(self, listing):
+        return (f'<div class="products-i"><a class="products-link" '
+                f'href="/elanlar/dasinmaz-emlak/menziller/{listing.item_id}">'
+                f'<div class="products-price"><span class="price-val">{listing.price}</span>'
+                f'<span class="price-cur">AZN</span></div><div class="products-name">{listing.title}</div>'
+                f'<div class="products-created">Bakı, {listing.day}</div></a></div>')
+
+    def index(self, cards, page, last):
+        more = '' if last else f'<a rel="next" href="{self.index_path}?page={page + 1}">Növbəti</a>'
+        return _page('Tap.az', f'<div class="products">{cards}</div>{more}{_SCROLL_JS}')
+
+    def detail(self, listing):
+        return _page(listing.title, (
+            f'<h1 class="product-title">{listing.title}</h1>'
+            f'<div class="product-price"><div class="product-price__i product-price__i--bold">'
+            f'<span class="price-val">{listing.price}</span><span class="price-cur">AZN</span></div></div>'
+            f'<div class="product-properties">{_properties(listing)}</div>'
+            f'<div class="product-description"><div class="product-description__content">{_description(listing)}</div></div>'
+            f'<span class="product-info__statistics__i-text">Elanın nömrəsi: {listing.item_id}</span>'
+            f'<span class="product-info__statistics__i-text">Yeniləndi: {listing.day}</span>'
+            f'<span class="product-info__statistics__i-text">Baxışların sayı: {listing.views}</span>'
+            f'<span class="product-shop__owner-name">{listing.owner}</span>'
+            f'<a class="shop--location" href="https://maps.google.com/maps?q={listing.latitude},{listing.longitude}">Xəritə</a>'
+            f'<button class="show-phones">Nömrəni göstər</button><ul class="phone-numbers"></ul>'
+            + _reveal('.show-phones', f'/ads/{listing.item_id}/phones', '.phone-numbers',
+                      '<li class="phone-numbers__i"><a href="tel:PHONE">PHONE</a></li>', method='POST')))
+
+    def routes(self, server):
+        return [web.get(self.index_path, server.index),
+                web.get('/elanlar/{category:[^/]+}/{subcategory:[^/]+}/{item_id:\\d+}', server.detail),
+                web.post('/ads/{item_id:\\d+}/phones', server.phones)]
+
+
+LAYOUTS = {'bina': Bina, 'lalafo': Lalafo, 'tapaz': Tapaz}
+
+
+class MockMarketplace:
+    """One emulated site: index pages, listings and the phone reveal endpoint, with injectable faults.
+
+    Every response waits `latency` seconds (jittered by ±50%), phone reveals
+    `phone_latency`. A request fails with a 500 with probability
+    `error_rate`, is answered 429 with a Retry-After of `retry_after`
+    seconds with probability `throttle_rate`, and is held an extra
+    `slow_delay` seconds with probability `slow_rate`. There are `pages`
+    index pages of `per_page` listings each.
+    """
+
+    def __init__(self, site, pages=200, per_page=24, latency=0.05, phone_latency=0.1, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=1, slow_rate=0.0, slow_delay=5.0, seed=0):
+        self.site = site
+        self.layout = LAYOUTS[site]()
+        self.pages = pages
+        self.per_page = per_page
+        self.latency = latency
+        self.phone_latency = phone_latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.counts = Counter()
+        self._random = random.Random(seed)
+
+    def item_ids(self, page):
+        start = self.layout.first_id + (page - 1) * self.per_page
+        return range(start, start + self.per_page)
+
+    @web.middleware
+    async def faults(self, request, handler):
+        if request.path == '/__stats':
+            return await handler(request)
+        self.counts['requests'] += 1
+        roll = self._random.random()
+        if roll < self.error_rate:
+            self.counts['errors'] += 1
+            raise web.HTTPInternalServerError()
+        if roll < self.error_rate + self.throttle_rate:
+            self.counts['throttled'] += 1
+            raise web.HTTPTooManyRequests(headers={'Retry-After': str(self.retry_after)})
+        delay = self.phone_latency if request.path.endswith('phones') or '/phones/' in request.path else self.latency
+        if self._random.random() < self.slow_rate:
+            self.counts['slow'] += 1
+            delay += self.slow_delay
+        await asyncio.sleep(delay * self._random.uniform(0.5, 1.5))
+        return await handler(request)
+
+    async def index(self, request):
+        try:
+            page = int(request.query.get('page', 1))
+        except ValueError:
+            raise web.HTTPBadRequest()
+        self.counts['index'] += 1
+        ids = self.item_ids(page) if 1 <= page <= self.pages else ()
+        cards = ''.join(self.layout.card(Listing(item_id)) for item_id in ids)
+        return web.Response(text=self.layout.index(cards, page, page >= self.pages), content_type='text/html')
+
+    def _listing(self, request):
+        item_id = int(request.match_info['item_id'])
+        first = self.layout.first_id
+        if not first <= item_id < first + self.pages * self.per_page:
+            raise web.HTTPNotFound()
+        return Listing(item_id)
+
+    async def detail(self, request):
+        listing = self._listing(request)
+        self.counts['detail'] += 1
+        return web.Response(text=self.layout.detail(listing), content_type='text/html')
+
+    async def phones(self, request):
+        listing = self._listing(request)
+        self.counts['phones'] += 1
+        return web.json_response({'phones': [listing.phone]})
+
+    async def stats(self, request):
+        return web.json_response(dict(self.counts))
+
+    def app(self):
+        app = web.Application(middlewares=[self.faults])
+        app.add_routes(self.layout.routes(self))
+        app.add_routes([web.get('/__stats', self.stats)])
+        return app
+
+
+async def serve(sites, host='127.0.0.1', port=8001, **options):
+    """Serve each of `sites` on its own port, from `port` up; returns the runners and their base URLs."""
+    runners, base_urls = [], {}
+    for offset, site in enumerate(sites):
+        runner = web.AppRunner(MockMarketplace(site, **options).app(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port + offset).start()
+        runners.append(runner)
+        base_urls[site] = f"http://{host}:{port + offset}"
+    return runners, base_urls
+
+
+def base_url_variable(site):
+    return f"{site.upper()}_BASE_URL"
+
+
+def add_options(parser):
+    """The MockMarketplace options, shared with the load test."""
+    parser.add_argument('--port', type=int, default=8001, help="port of the first site; the others follow")
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--per-page', type=int, default=24)
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds per response")
+    parser.add_argument('--phone-latency', type=float, default=0.1, help="seconds per phone reveal")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered 500")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="share of requests held --slow-delay longer")
+    parser.add_argument('--slow-delay', type=float, default=5.0)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description="Serve local copies of the marketplaces for load tests.")
+    parser.add_argument('--site', action='append', choices=SITE_NAMES, help="default: all three")
+    parser.add_argument('--host', default='127.0.0.1')
+    return add_options(parser)
+
+
+def options(args):
+    return {name: getattr(args, name) for name in (
+        'pages', 'per_page', 'latency', 'phone_latency', 'error_rate', 'throttle_rate', 'retry_after',
+        'slow_rate', 'slow_delay', 'seed')}
+
+
+async def main(args):
+    _, base_urls = await serve(args.site or SITE_NAMES, args.host, args.port, **options(args))
+    for site, url in base_urls.items():
+        print(f"export {base_url_variable(site)}={url}", flush=True)
+    await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main(arguments().parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,111 @@
+import datetime
+import json
+import os
+import re
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from scraping_core.records import parse_date, parse_datetime
+from scraping_core.writer import BufferedWriter
+
+
+def _to_float(value):
+    if value is None or isinstance(value, float):
+        return value
+    match = re.search(r'-?\d+(?:[.,]\d+)?', re.sub(r'\s+', '', str(value)))
+    return float(match.group().replace(',', '.')) if match else None
+
+
+def _to_int(value):
+    if value is None or isinstance(value, int):
+        return value
+    digits = re.sub(r'\D', '', str(value))
+    return int(digits) if digits else None
+
+
+def _to_date(value):
+    if value is None or isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return parse_date(str(value))
+
+
+def _to_datetime(value):
+    if value is None or isinstance(value, datetime.datetime):
+        return value
+    return parse_datetime(str(value))
+
+
+def _to_map(value):
+    if value is None:
+        return None
+    pairs = json.loads(value) if isinstance(value, str) else value
+    return list(pairs.items())
+
+
+# Columns with a non-string type; everything else is stored as a string.
+TYPED_COLUMNS = {
+    'price': (pa.float64(), _to_float),
+    'latitude': (pa.float64(), _to_float),
+    'longitude': (pa.float64(), _to_float),
+    'views': (pa.int64(), _to_int),
+    'page': (pa.int32(), _to_int),
+    'created_date': (pa.date32(), _to_date),
+    'updated_date': (pa.date32(), _to_date),
+    'posted': (pa.timestamp('s'), _to_datetime),
+    'information': (pa.map_(pa.string(), pa.string()), _to_map),
+}
+
+
+def _to_str(value):
+    return None if value is None else str(value)
+
+
+def schema_for(columns):
+    return pa.schema([(column, TYPED_COLUMNS.get(column, (pa.string(),))[0]) for column in columns])
+
+
+def _free_path(path):
+    # Parquet files cannot be appended to, so a rerun writes a new part file.
+    stem, extension = os.path.splitext(path)
+    part = 1
+    while os.path.exists(path):
+        path = f"{stem}-{part}{extension}"
+        part += 1
+    return path
+
+
+class ParquetWriter(BufferedWriter):
+    """Typed Parquet output; each flushed batch becomes one row group.
+
+    price/latitude/longitude are float64, views and page are integers, the
+    listing dates are dates (`posted` a timestamp) and `information` is a
+    string map. Strings are dictionary-encoded and row
+    groups are zstd-compressed, so the crawl is never held in memory.
+    """
+
+    def __init__(self, path, columns, batch_size=20000, flush_interval=60.0, **kwargs):
+        super().__init__(path, columns, batch_size=batch_size, flush_interval=flush_interval, **kwargs)
+        self.schema = schema_for(self.columns)
+        self._converters = [TYPED_COLUMNS.get(column, (None, _to_str))[1] for column in self.columns]
+
+    def _open(self):
+        self.path = _free_path(self.path)
+        self._writer = pq.ParquetWriter(self.path, self.schema, compression='zstd', use_dictionary=True)
+
+    def _write(self, batch):
+        arrays = {}
+        for column, convert in zip(self.columns, self._converters):
+            values = []
+            for row in batch:
+                try:
+                    values.append(convert(row.get(column)))
+                except (ValueError, TypeError, AttributeError):
+                    values.append(None)
+            arrays[column] = values
+        self._writer.write_table(pa.Table.from_pydict(arrays, schema=self.schema))
+
+    def _close(self):
+        self._writer.close()
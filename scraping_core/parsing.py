@@ -0,0 +1,266 @@
+import re
+from collections import defaultdict
+
+_COMPOUND = re.compile(r'^([A-Za-z][\w-]*)?((?:[.#][\w-]+|\[[\w-]+=[\w-]+\])*)$')
+
+
+class Bs4Backend:
+    """Reference backend: BeautifulSoup with the stdlib html.parser."""
+
+    name = 'bs4'
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def parse(self, html):
+        return self._soup(html, 'html.parser')
+
+    def elements(self, root):
+        return root.find_all(True)
+
+    def descendants(self, node):
+        return node.find_all(True)
+
+    def tag(self, node):
+        return node.name
+
+    def classes(self, node):
+        return node.get('class') or ()
+
+    def attr(self, node, name):
+        return node.get(name)
+
+    def parent(self, node):
+        return node.parent
+
+    def text(self, node):
+        return node.get_text()
+
+
+class LxmlBackend:
+    name = 'lxml'
+
+    def __init__(self):
+        from lxml import etree, html
+        self._element = etree.Element
+        self._html = html
+
+    def parse(self, html):
+        return self._html.document_fromstring(html)
+
+    def elements(self, root):
+        return root.iter(self._element)
+
+    def descendants(self, node):
+        return node.iterdescendants(self._element)
+
+    def tag(self, node):
+        return node.tag
+
+    def classes(self, node):
+        return node.get('class', '').split()
+
+    def attr(self, node, name):
+        return node.get(name)
+
+    def parent(self, node):
+        return node.getparent()
+
+    def text(self, node):
+        return node.text_content()
+
+
+class SelectolaxBackend:
+    name = 'selectolax'
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser as HTMLParser
+        except ImportError:  # selectolax < 0.3 only ships the Modest parser
+            from selectolax.parser import HTMLParser
+        self._parser = HTMLParser
+
+    def parse(self, html):
+        return self._parser(html).root
+
+    def elements(self, root):
+        return root.traverse(include_text=False)
+
+    def descendants(self, node):
+        nodes = node.traverse(include_text=False)
+        next(nodes, None)  # traverse() starts with the node itself
+        return nodes
+
+    def tag(self, node):
+        return node.tag
+
+    def classes(self, node):
+        return (node.attributes.get('class') or '').split()
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+    def parent(self, node):
+        return node.parent
+
+    def text(self, node):
+        return node.text(deep=True)
+
+
+BACKENDS = {
+    'selectolax': SelectolaxBackend,
+    'lxml': LxmlBackend,
+    'bs4': Bs4Backend,
+}
+
+_instances = {}
+
+
+def get_backend(name=None):
+    """Return the named parser backend, or the fastest one that is installed."""
+    names = [name] if name else list(BACKENDS)
+    for candidate in names:
+        if candidate in _instances:
+            return _instances[candidate]
+        try:
+            _instances[candidate] = BACKENDS[candidate]()
+            return _instances[candidate]
+        except ImportError:
+            if name:
+                raise
+    raise ImportError("No HTML parser backend is installed")
+
+
+class _Compound:
+    __slots__ = ('tag', 'id', 'classes', 'attrs')
+
+    def __init__(self, css):
+        match = _COMPOUND.match(css)
+        if not match:
+            raise ValueError(f"Unsupported selector: {css!r}")
+        self.tag = match.group(1)
+        self.id = None
+        classes = []
+        for part in re.findall(r'[.#][\w-]+', match.group(2)):
+            if part[0] == '#':
+                self.id = part[1:]
+            else:
+                classes.append(part[1:])
+        self.classes = frozenset(classes)
+        self.attrs = re.findall(r'\[([\w-]+)=([\w-]+)\]', match.group(2))
+
+    def matches(self, backend, node):
+        if self.tag and backend.tag(node) != self.tag:
+            return False
+        if self.id and backend.attr(node, 'id') != self.id:
+            return False
+        for name, expected in self.attrs:
+            value = backend.attr(node, name)
+            if isinstance(value, list):  # bs4 splits multi-valued attributes such as rel
+                value = ' '.join(value)
+            if value != expected:
+                return False
+        return not self.classes or self.classes.issubset(backend.classes(node))
+
+
+class Selector:
+    """A compiled selector: compounds of tag, `#id`, `.class` and `[attr=value]` joined by descendant combinators."""
+
+    def __init__(self, css):
+        self.css = css
+        self.steps = [_Compound(part) for part in css.split()]
+
+    @property
+    def key(self):
+        last = self.steps[-1]
+        if last.id:
+            return 'id', last.id
+        if last.classes:
+            return 'class', min(last.classes)
+        return 'tag', last.tag
+
+    def matches(self, backend, node):
+        if not self.steps[-1].matches(backend, node):
+            return False
+        remaining = len(self.steps) - 2
+        ancestor = backend.parent(node)
+        while remaining >= 0 and ancestor is not None:
+            if backend.tag(ancestor) and self.steps[remaining].matches(backend, ancestor):
+                remaining -= 1
+            ancestor = backend.parent(ancestor)
+        return remaining < 0
+
+    def select(self, backend, node):
+        return [child for child in backend.descendants(node) if self.matches(backend, child)]
+
+    def select_one(self, backend, node):
+        for child in backend.descendants(node):
+            if self.matches(backend, child):
+                return child
+        return None
+
+
+def first_text(backend, nodes):
+    return backend.text(nodes[0]).strip() if nodes else None
+
+
+class Field:
+    """One output field: the nodes matching `selector` turned into a value by `extract(backend, nodes)`."""
+
+    def __init__(self, name, selector, extract=first_text, many=False):
+        self.name = name
+        self.selector = Selector(selector)
+        self.extract = extract
+        self.many = many
+
+
+class ExtractionPlan:
+    """Fields compiled once and collected from a document in a single traversal.
+
+    Selectors are indexed by the id, a class or the tag of their last
+    compound, so each element is only checked against the few fields that
+    could match it.
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self._index = defaultdict(list)
+        for position, field in enumerate(self.fields):
+            self._index[field.selector.key].append(position)
+        self._stops_early = not any(field.many for field in self.fields)
+
+    def collect(self, backend, root):
+        found = [[] for _ in self.fields]
+        index = self._index
+        pending = len(self.fields)
+        for node in backend.elements(root):
+            candidates = list(index.get(('tag', backend.tag(node)), ()))
+            element_id = backend.attr(node, 'id')
+            if element_id:
+                candidates.extend(index.get(('id', element_id), ()))
+            for name in backend.classes(node):
+                candidates.extend(index.get(('class', name), ()))
+            for position in candidates:
+                field = self.fields[position]
+                nodes = found[position]
+                if (field.many or not nodes) and field.selector.matches(backend, node):
+                    nodes.append(node)
+                    pending -= not field.many
+            if self._stops_early and not pending:
+                break
+        return found
+
+    def extract(self, html, backend):
+        return self.extract_node(backend, backend.parse(html))
+
+    def extract_node(self, backend, root):
+        """Like `extract`, for a subtree of an already parsed document (e.g. one card of a grid)."""
+        values = {}
+        for field, nodes in zip(self.fields, self.collect(backend, root)):
+            try:
+                values[field.name] = field.extract(backend, nodes)
+            except Exception as e:
+                print(f"Could not extract {field.name}: {e}")
+                values[field.name] = None
+        return values
@@ -0,0 +1,61 @@
+import re
+
+# Statuses a reveal endpoint answers a missing or stale CSRF token with (Rails, Laravel).
+TOKEN_REJECTED = (419, 422)
+_CSRF_META = re.compile(r'<meta[^>]*name="csrf-token"[^>]*content="([^"]*)"'
+                        r'|<meta[^>]*content="([^"]*)"[^>]*name="csrf-token"')
+
+
+class PhoneReveal:
+    """The request a site's "show phone" button sends.
+
+    `url_template` is formatted with the listing's `item_id`; the response is
+    JSON with the numbers under `phones_key`.
+    """
+
+    def __init__(self, url_template, method='GET', csrf_header='X-CSRF-Token', phones_key='phones'):
+        self.url_template = url_template
+        self.method = method
+        self.csrf_header = csrf_header
+        self.phones_key = phones_key
+
+
+def csrf_token(html):
+    match = _CSRF_META.search(html)
+    if match:
+        return match.group(1) or match.group(2)
+    return None
+
+
+async def fetch_listing(http, url, item_id, reveal):
+    """Fetch a listing page and replay its phone reveal request, without a browser.
+
+    Each listing gets its own cookie jar so the CSRF token always matches the
+    session cookie it was issued with. Returns `(html, phones)`, with no
+    phones when the reveal request rejected the token or did not answer
+    with JSON; only then is Chrome worth trying. Any other HTTP error is
+    raised, for the caller's retry policy to classify. Phones are returned as
+    the endpoint sent them; SiteSpec.extract formats them like the page does.
+    """
+    async with http.isolated() as session:
+        async with session.get(url) as response:
+            response.raise_for_status()
+            html = await response.text()
+
+        headers = {'X-Requested-With': 'XMLHttpRequest', 'Referer': url,
+                   'Accept': 'application/json, text/javascript, */*; q=0.01'}
+        token = csrf_token(html)
+        if token:
+            headers[reveal.csrf_header] = token
+        phones_url = reveal.url_template.format(item_id=item_id)
+        async with session.request(reveal.method, phones_url, headers=headers) as response:
+            if response.status in TOKEN_REJECTED:
+                return html, []
+            response.raise_for_status()
+            try:
+                payload = await response.json(content_type=None)
+            except ValueError:
+                return html, []
+
+    phones = [str(phone).strip() for phone in payload.get(reveal.phones_key) or []]
+    return html, [phone for phone in phones if phone]
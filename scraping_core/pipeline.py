@@ -0,0 +1,124 @@
+import asyncio
+import itertools
+import time
+
+_DONE = object()
+
+
+def _page_source(pages):
+    """Return an awaitable `next()` over `pages` that several producers can share."""
+    if hasattr(pages, '__aiter__'):
+        iterator = pages.__aiter__()
+        lock = asyncio.Lock()
+
+        async def next_page():
+            async with lock:
+                try:
+                    return await iterator.__anext__()
+                except StopAsyncIteration:
+                    return _DONE
+    else:
+        iterator = iter(pages)
+
+        async def next_page():
+            return next(iterator, _DONE)
+    return next_page
+
+
+class Pipeline:
+    """Streaming crawl: index-page producers feed detail workers through a bounded queue.
+
+    `produce(page)` returns the items found on an index page and
+    `consume(item, page)` scrapes one of them. `producers` and `consumers`
+    bound the concurrency of each stage; a full queue pauses the producers
+    so discovery never runs far ahead of scraping. `on_page_done(page,
+    items)` is awaited once every item of a page has been consumed; pages
+    whose `produce` raised are collected in `failed_pages`. Every
+    page taken from `pages` is tracked under its own token, so pages need
+    not be hashable (e.g. a batch of card records) and the same page may be
+    in flight twice (e.g. leased again after its lease expired). With `metrics` the index pages are timed, failures are
+    counted and the queue depth and items in flight are exposed as gauges.
+    """
+
+    def __init__(self, produce, consume, producers=2, consumers=30, queue_size=100, on_page_done=None,
+                 metrics=None):
+        self.produce = produce
+        self.consume = consume
+        self.producers = producers
+        self.consumers = consumers
+        self.queue_size = queue_size
+        self.on_page_done = on_page_done
+        self.metrics = metrics
+        self.queue = None
+        self.in_flight = 0
+        self.failed_pages = []
+
+    async def _page_finished(self, page, items):
+        if self.on_page_done is not None:
+            await self.on_page_done(page, items)
+
+    async def run(self, pages):
+        """Crawl `pages`, a plain or an async iterable (e.g. jobs leased from a WorkQueue)."""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        next_page = _page_source(pages)
+        outstanding = {}
+        tokens = itertools.count()
+        if self.metrics is not None:
+            self.metrics.gauge('queue_depth', self.queue.qsize)
+            self.metrics.gauge('in_flight', lambda: self.in_flight)
+
+        async def producer():
+            while True:
+                page = await next_page()
+                if page is _DONE:
+                    return
+                start = time.perf_counter()
+                try:
+                    items = await self.produce(page)
+                except Exception as e:
+                    print(f"Could not fetch index page {page}: {e}")
+                    self.failed_pages.append(page)
+                    if self.metrics is not None:
+                        self.metrics.count('index_failed')
+                    continue
+                if self.metrics is not None:
+                    self.metrics.observe('index_page', time.perf_counter() - start)
+                    self.metrics.count('index_pages')
+                if not items:
+                    await self._page_finished(page, 0)
+                    continue
+                token = next(tokens)
+                outstanding[token] = [len(items), len(items)]
+                for item in items:
+                    await self.queue.put((token, page, item))
+
+        async def consumer():
+            while True:
+                job = await self.queue.get()
+                if job is None:
+                    return
+                token, page, item = job
+                self.in_flight += 1
+                try:
+                    await self.consume(item, page)
+                except Exception as e:
+                    print(f"An error occurred: {e}")
+                    if self.metrics is not None:
+                        self.metrics.count('items_failed')
+                finally:
+                    self.in_flight -= 1
+                    counts = outstanding[token]
+                    counts[0] -= 1
+                    if counts[0] == 0:
+                        del outstanding[token]
+                        await self._page_finished(page, counts[1])
+
+        consumers = [asyncio.create_task(consumer()) for _ in range(self.consumers)]
+        try:
+            await asyncio.gather(*(producer() for _ in range(self.producers)))
+            for _ in consumers:
+                await self.queue.put(None)
+            await asyncio.gather(*consumers)
+        finally:
+            for task in consumers:
+                task.cancel()
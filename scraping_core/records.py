@@ -0,0 +1,178 @@
+import datetime
+import re
+
+# Every column any site writes, with the type its values are normalized to.
+FIELDS = {
+    'item_id': str,
+    'url': str,
+    'title': str,
+    'phone_number': str,
+    'owner_name': str,
+    'owner_category': str,
+    'price': float,
+    'currency': str,
+    'information': str,
+    'content': str,
+    'views': int,
+    'created_date': datetime.date,
+    'updated_date': datetime.date,
+    'posted': datetime.datetime,
+    'location': str,
+    'latitude': float,
+    'longitude': float,
+    'page': int,
+    'source': str,
+    'change': str,
+}
+
+MONTHS = {
+    'yanvar': 1, 'fevral': 2, 'mart': 3, 'aprel': 4, 'may': 5, 'iyun': 6,
+    'iyul': 7, 'avqust': 8, 'sentyabr': 9, 'oktyabr': 10, 'noyabr': 11, 'dekabr': 12,
+    'января': 1, 'февраля': 2, 'марта': 3, 'апреля': 4, 'мая': 5, 'июня': 6,
+    'июля': 7, 'августа': 8, 'сентября': 9, 'октября': 10, 'ноября': 11, 'декабря': 12,
+}
+RELATIVE_DAYS = {'bugün': 0, 'сегодня': 0, 'today': 0, 'dünən': 1, 'вчера': 1, 'yesterday': 1}
+CURRENCIES = {'azn': 'AZN', '₼': 'AZN', 'man': 'AZN', 'manat': 'AZN', 'usd': 'USD', '$': 'USD',
+              'eur': 'EUR', '€': 'EUR', 'rub': 'RUB', '₽': 'RUB'}
+
+_ISO_DATE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+_DOTTED_DATE = re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{4})')
+_NAMED_DATE = re.compile(r'(\d{1,2})\s+([^\W\d_]+)\.?,?(?:\s+(\d{4}))?')
+_TIME = re.compile(r'(\d{1,2}):(\d{2})')
+_WORD = re.compile(r'[^\W\d_]+')
+_NUMBER = re.compile(r'\d+(?:[.,]\d+)?')
+_CURRENCY = re.compile(r'[^\W\d_]+|[₼$€₽]')
+
+
+class Listing:
+    """One output row with typed values, the same columns and types for every site.
+
+    Slots instead of a dict per row; columns a site does not have are None.
+    `get(column)` reads like a dict, so writers take either.
+    """
+
+    __slots__ = tuple(FIELDS)
+
+    def __init__(self, *values, **named):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+        for name in self.__slots__[len(values):]:
+            setattr(self, name, named.get(name))
+
+    def get(self, column, default=None):
+        return getattr(self, column, default)
+
+    def as_dict(self, columns=None):
+        return {column: getattr(self, column, None) for column in (columns or self.__slots__)}
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={value!r}' for name, value in self.as_dict().items() if value is not None)
+        return f'Listing({values})'
+
+
+def parse_number(value):
+    """First number in the text, spaces inside it ignored: "363 879 AZN" -> 363879.0."""
+    match = _NUMBER.search(re.sub(r'\s+', '', value))
+    return float(match.group().replace(',', '.')) if match else None
+
+
+def parse_count(value):
+    """Every digit in the text: "Baxışların sayı: 1234" -> 1234."""
+    digits = re.sub(r'\D', '', value)
+    return int(digits) if digits else None
+
+
+def parse_currency(value):
+    for token in _CURRENCY.findall(value):
+        currency = CURRENCIES.get(token.lower())
+        if currency is not None:
+            return currency
+    return None
+
+
+def parse_coordinate(value, limit):
+    number = float(value.strip().replace(',', '.'))
+    return number if -limit <= number <= limit else None
+
+
+def _find_day(value, today):
+    """The day a date text names and where its date ends, or (None, 0)."""
+    match = _ISO_DATE.search(value)
+    if match:
+        return datetime.date(int(match.group(1)), int(match.group(2)), int(match.group(3))), match.end()
+    match = _DOTTED_DATE.search(value)
+    if match:
+        return datetime.date(int(match.group(3)), int(match.group(2)), int(match.group(1))), match.end()
+    for match in _NAMED_DATE.finditer(value):
+        month = MONTHS.get(match.group(2).lower())
+        if month is None:
+            continue
+        day = datetime.date(int(match.group(3) or today.year), month, int(match.group(1)))
+        if match.group(3) is None and day > today:
+            day = day.replace(year=today.year - 1)
+        return day, match.end()
+    for match in _WORD.finditer(value.lower()):
+        if match.group() in RELATIVE_DAYS:
+            return today - datetime.timedelta(days=RELATIVE_DAYS[match.group()]), match.end()
+    return None, 0
+
+
+def parse_datetime(value, today=None):
+    """The date (and time, when given) in a listing's date text.
+
+    Understands ISO and dd.mm.yyyy dates, "20 oktyabr 2026" in Azerbaijani or
+    Russian, and today/yesterday in either; a date without a year is taken to
+    be the latest one not after `today`.
+    """
+    day, end = _find_day(value, today or datetime.date.today())
+    if day is None:
+        return None
+    time = _TIME.search(value, end)
+    hour, minute = (int(time.group(1)), int(time.group(2))) if time else (0, 0)
+    return datetime.datetime(day.year, day.month, day.day, hour, minute)
+
+
+def parse_date(value, today=None):
+    moment = parse_datetime(value, today)
+    return moment.date() if moment is not None else None
+
+
+def _column(values, convert):
+    """`convert` applied to a column; each distinct raw value is converted once per batch."""
+    converted = {}
+    result = []
+    for value in values:
+        if value is None or not isinstance(value, str):
+            result.append(value)
+            continue
+        if value not in converted:
+            try:
+                converted[value] = convert(value)
+            except (ValueError, TypeError):
+                converted[value] = None
+        result.append(converted[value])
+    return result
+
+
+def normalize_batch(rows, today=None):
+    """Typed Listing records for a batch of raw rows, converted one column at a time.
+
+    Prices become floats, with the currency taken from the price text when
+    the site has no separate currency element; views and page numbers become
+    ints, dates dates (`posted` keeps its time) and coordinates floats within
+    range. Text that does not parse becomes None rather than failing the batch.
+    """
+    today = today or datetime.date.today()
+    columns = {name: [row.get(name) for row in rows] for name in FIELDS}
+    currencies = _column(columns['currency'], lambda value: parse_currency(value) or value.strip() or None)
+    priced_in = _column(columns['price'], parse_currency)
+    columns['currency'] = [currency or fallback for currency, fallback in zip(currencies, priced_in)]
+    columns['price'] = _column(columns['price'], parse_number)
+    for name in ('views', 'page'):
+        columns[name] = _column(columns[name], parse_count)
+    for name in ('created_date', 'updated_date'):
+        columns[name] = _column(columns[name], lambda value: parse_date(value, today))
+    columns['posted'] = _column(columns['posted'], lambda value: parse_datetime(value, today))
+    columns['latitude'] = _column(columns['latitude'], lambda value: parse_coordinate(value, 90))
+    columns['longitude'] = _column(columns['longitude'], lambda value: parse_coordinate(value, 180))
+    return [Listing(*values) for values in zip(*columns.values())]
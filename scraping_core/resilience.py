@@ -0,0 +1,192 @@
+import asyncio
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+RETRY = 'retry'
+BLOCKED = 'blocked'
+FATAL = 'fatal'
+
+
+def classify(exc):
+    """How to treat a failed request: retry it, back off from a blocking site, or give up."""
+    status = getattr(exc, 'status', None)
+    if status in (403, 429):
+        return BLOCKED
+    if status is not None and 400 <= status < 500:
+        return FATAL
+    return RETRY
+
+
+def retry_after(exc):
+    headers = getattr(exc, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """`rate` requests per second with bursts of up to `burst`; safe to share between threads."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        # Tokens may go negative: each caller reserves its place in line and sleeps until then.
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def take(self):
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def take_sync(self):
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+
+class DomainLimiter:
+    """One token bucket per host, shared by the HTTP client and the Chrome sessions."""
+
+    def __init__(self, rate=5.0, burst=10):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        host = urlsplit(str(url)).hostname or ''
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    async def wait(self, url):
+        await self.bucket(url).take()
+
+    def wait_sync(self, url):
+        self.bucket(url).take_sync()
+
+
+class CircuitBreaker:
+    """Pause a site's requests after `threshold` failures in a row.
+
+    Blocking answers (403/429) trip it sooner: `block_threshold` of them in
+    a row are enough. While open every caller waits; after `cooldown`
+    seconds a single probe is let through, and its outcome closes the
+    breaker or opens it again.
+    """
+
+    def __init__(self, site, threshold=10, cooldown=60.0, block_threshold=3):
+        self.site = site
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.block_threshold = block_threshold
+        self.failures = 0
+        self.blocks = 0
+        self.trips = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def open(self):
+        return self._opened_at is not None
+
+    async def wait(self):
+        while self._opened_at is not None:
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+            if remaining <= 0 and not self._probing:
+                self._probing = True
+                return
+            await asyncio.sleep(max(remaining, 1.0))
+
+    def record(self, ok, blocked=False):
+        if ok:
+            if self._opened_at is not None:
+                print(f"[{self.site}] circuit closed")
+            self.failures = 0
+            self.blocks = 0
+            self._opened_at = None
+            self._probing = False
+            return
+        self.failures += 1
+        self.blocks = self.blocks + 1 if blocked else 0
+        tripped = self.failures >= self.threshold or self.blocks >= self.block_threshold
+        if self._probing or (self._opened_at is None and tripped):
+            if not self._probing:
+                self.trips += 1
+                print(f"[{self.site}] circuit open after {self.failures} failures, pausing {self.cooldown}s")
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class Retrier:
+    """Retry a site's requests with exponential backoff, full jitter and a circuit breaker.
+
+    `call(fn, *args, **kwargs)` awaits `fn(*args, **kwargs)` up to `attempts` times. Errors are
+    `classify`d: fatal ones (404 and other client errors) are raised at once,
+    everything else is retried after `base_delay * 2**attempt` seconds at
+    most (or the server's Retry-After). Blocking ones (403/429) wait longer,
+    `blocked_delay * 2**attempt` seconds up to `max_blocked_delay`, never less
+    than Retry-After, and trip the circuit breaker sooner. The last error is
+    raised once the attempts are used up.
+    """
+
+    def __init__(self, site, attempts=3, base_delay=1.0, max_delay=30.0, breaker=None, blocked_delay=10.0,
+                 max_blocked_delay=300.0):
+        self.site = site
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.blocked_delay = blocked_delay
+        self.max_blocked_delay = max_blocked_delay
+        self.breaker = breaker or CircuitBreaker(site)
+        self.retries = 0
+
+    def delay(self, attempt, exc=None, kind=RETRY):
+        if kind == BLOCKED:
+            # Half the step is fixed, so a blocking site always gets some quiet time
+            step = min(self.max_blocked_delay, self.blocked_delay * 2 ** attempt)
+            return max(random.uniform(step / 2, step), retry_after(exc) or 0)
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, min(self.max_delay, retry_after(exc) or 0))
+
+    async def call(self, fn, *args, **kwargs):
+        for attempt in range(self.attempts):
+            await self.breaker.wait()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                kind = classify(e)
+                if kind == FATAL:
+                    # The site answered; it just has nothing for us at this URL.
+                    self.breaker.record(True)
+                    raise
+                self.breaker.record(False, blocked=kind == BLOCKED)
+                if attempt + 1 == self.attempts:
+                    raise
+                self.retries += 1
+                delay = self.delay(attempt, e, kind)
+                print(f"[{self.site}] attempt {attempt + 1} failed ({kind}: {e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record(True)
+                return result
+
+    def stats(self):
+        return {'retries': self.retries, 'circuit_trips': self.breaker.trips}
+
+    def report(self):
+        print(f"[{self.site}] retries: {self.stats()}")
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+
+from scraping_core.work_queue import WorkQueue, start_processes
+
+
+def crawl_arguments(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--processes', type=int, default=0,
+                        help="run N worker processes that lease jobs from a shared queue")
+    parser.add_argument('--queue', default='crawl_queue.sqlite',
+                        help="work queue file shared by the workers (on a local disk)")
+    parser.add_argument('--join', action='store_true',
+                        help="only run workers against a queue another process seeds")
+    parser.add_argument('--retry-failed', action='store_true',
+                        help="only retry the listings that failed in earlier runs")
+    parser.add_argument('--reparse', action='store_true',
+                        help="re-extract the archived pages with the current extractors, fetching nothing")
+    return parser
+
+
+def _worker(index, main, queue_path):
+    asyncio.run(main(queue_path=queue_path, worker=index))
+
+
+def run_crawl(main, args, seed=None, reparse=None, queue_name=None):
+    """Run `main()` in this process, or shard it across `args.processes` workers.
+
+    In sharded mode `seed(queue)` fills and seals the queue (unless
+    `--join` is given) while the workers are already consuming it; the
+    queue is reset first, so jobs finished by an earlier crawl run again. The
+    retry pass over failed listings always runs in this process, and so does
+    `reparse()`, which spreads its work over the cores by itself.
+    """
+    if args.reparse:
+        asyncio.run(reparse())
+        return
+    if args.retry_failed:
+        asyncio.run(main(retry_failed=True))
+        return
+    if not args.processes:
+        asyncio.run(main())
+        return
+    if seed is None or args.join:
+        processes = start_processes(_worker, args.processes, main, args.queue)
+    else:
+        queue = WorkQueue(args.queue)
+        try:
+            # Before the workers start, or they would find the last crawl's sealed queue drained.
+            if queue_name is not None:
+                queue.reset(queue_name)
+            processes = start_processes(_worker, args.processes, main, args.queue)
+            asyncio.run(seed(queue))
+        finally:
+            queue.close()
+    for process in processes:
+        process.join()
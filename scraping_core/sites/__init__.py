@@ -0,0 +1,9 @@
+from scraping_core.sites.bina import BINA
+from scraping_core.sites.lalafo import LALAFO
+from scraping_core.sites.tapaz import TAPAZ
+
+SITES = {site.name: site for site in (BINA, LALAFO, TAPAZ)}
+
+
+def get_site(name):
+    return SITES[name]
@@ -0,0 +1,40 @@
+from scraping_core.phone_reveal import PhoneReveal
+from scraping_core.spec import ALL, CardSpec, FieldSpec, Join, Pairs, SiteSpec
+
+PRICE = 'div.product-price__i.product-price__i--bold'
+
+BINA = SiteSpec(
+    name='bina',
+    base_url='https://bina.az',
+    columns=['item_id', 'url', 'phone_number', 'owner_name', 'owner_category', 'price', 'information',
+             'currency', 'latitude', 'longitude', 'content', 'updated_date', 'views'],
+    fields=[
+        FieldSpec('phone_number', 'div.product-phones__list-i a', take='@href', post='tel_digits'),
+        FieldSpec('owner_name', 'div.product-owner__info-name'),
+        FieldSpec('owner_category', 'div.product-owner__info-region'),
+        FieldSpec('price', PRICE + ' span.price-val', post='compact'),
+        FieldSpec('currency', PRICE + ' span.price-cur'),
+        FieldSpec('information', 'div.product-properties__i', index=ALL, post='json',
+                  take=Pairs('label.product-properties__i-name', 'span.product-properties__i-value')),
+        FieldSpec('latitude', '#item_map', take='@data-lat'),
+        FieldSpec('longitude', '#item_map', take='@data-lng'),
+        FieldSpec('content', 'div.product-description__content', take=Join('p')),
+        FieldSpec('updated_date', 'span.product-statistics__i-text', index=0),
+        FieldSpec('views', 'span.product-statistics__i-text', index=1),
+    ],
+    phone_reveal=PhoneReveal('https://bina.az/items/{item_id}/phones'),
+    browser_allow=['https://bina.az/items/*/phones*'],
+    cards=CardSpec(
+        'div.items-i',
+        item_id=lambda href: href.split('/')[-1],
+        columns=['item_id', 'url', 'price', 'currency', 'title', 'location', 'posted'],
+        fields=[
+            FieldSpec('price', 'span.price-val', post='compact'),
+            FieldSpec('currency', 'span.price-cur'),
+            FieldSpec('title', 'ul.name', take=Join('li', ', ')),
+            FieldSpec('location', 'div.location'),
+            FieldSpec('posted', 'div.city_when', post='day'),
+        ],
+        watch=['price', 'currency', 'title', 'posted'],
+    ),
+)
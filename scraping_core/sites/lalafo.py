@@ -0,0 +1,38 @@
+from scraping_core.spec import ALL, CardSpec, FieldSpec, Nested, Pairs, SiteSpec
+
+LALAFO = SiteSpec(
+    name='lalafo',
+    base_url='https://lalafo.az',
+    # currency is not on the page on its own; the normalizer reads it from the price text. Output files
+    # written before this column existed have another header, and CsvWriter will not append to them.
+    columns=['item_id', 'title', 'url', 'phone_number', 'owner_name', 'price', 'currency', 'information',
+             'content', 'views', 'created_date', 'updated_date'],
+    fields=[
+        FieldSpec('title', 'h1.ad-detail-title'),
+        FieldSpec('phone_number', 'div.phone-number__wrap a', take='@href', post='tel'),
+        FieldSpec('owner_name', 'span.userName-text'),
+        FieldSpec('price', 'p.LFHeading'),
+        FieldSpec('information', 'ul.details-page__params li', take=Pairs('p', 'a'), index=ALL, post='json'),
+        FieldSpec('content', 'div.description__wrap span'),
+        FieldSpec('views', 'div.impressions span'),
+        FieldSpec('created_date', 'div.about-ad-info__date', take=Nested('span', 1), index=0),
+        FieldSpec('updated_date', 'div.about-ad-info__date', take=Nested('span', 1), index=1),
+    ],
+    # Phones come from a signed API call, not a replayable CSRF-protected
+    # endpoint, so lalafo listings are always revealed in Chrome.
+    phone_reveal=None,
+    browser_allow=['https://lalafo.az/api/*'],
+    cards=CardSpec(
+        'div.lf-ad-tile',
+        item_id=lambda href: href.split('-')[-1],
+        link='a.lf-ad-tile__link',
+        columns=['item_id', 'title', 'url', 'price', 'location', 'posted'],
+        fields=[
+            FieldSpec('title', 'p.lf-ad-tile__title'),
+            FieldSpec('price', 'p.lf-ad-tile__price'),
+            FieldSpec('location', 'p.lf-ad-tile__city'),
+            FieldSpec('posted', 'p.lf-ad-tile__date', post='day'),
+        ],
+        watch=['title', 'price', 'posted'],
+    ),
+)
@@ -0,0 +1,41 @@
+from scraping_core.phone_reveal import PhoneReveal
+from scraping_core.spec import ALL, CardSpec, FieldSpec, Join, Pairs, SiteSpec
+
+PRICE = 'div.product-price__i.product-price__i--bold'
+STATISTICS = 'span.product-info__statistics__i-text'
+
+TAPAZ = SiteSpec(
+    name='tapaz',
+    base_url='https://tap.az',
+    columns=['item_id', 'title', 'url', 'phone_number', 'owner_name', 'price', 'currency', 'information',
+             'content', 'views', 'created_date', 'latitude', 'longitude'],
+    fields=[
+        FieldSpec('title', 'h1.product-title'),
+        FieldSpec('phone_number', 'li.phone-numbers__i a', take='@href', post='tel'),
+        FieldSpec('owner_name', 'span.product-shop__owner-name'),
+        FieldSpec('price', PRICE + ' span.price-val', post='compact'),
+        FieldSpec('currency', PRICE + ' span.price-cur'),
+        FieldSpec('information', 'div.product-properties__i', index=ALL, post='json',
+                  take=Pairs('label.product-properties__i-name', 'span.product-properties__i-value')),
+        FieldSpec('content', 'div.product-description__content', take=Join('p')),
+        FieldSpec('views', STATISTICS, index=2),
+        FieldSpec('created_date', STATISTICS, index=1),
+        FieldSpec('latitude', 'a.shop--location', take='@href', post='map_lat'),
+        FieldSpec('longitude', 'a.shop--location', take='@href', post='map_lng'),
+    ],
+    phone_reveal=PhoneReveal('https://tap.az/ads/{item_id}/phones', method='POST'),
+    browser_allow=['https://tap.az/ads/*/phones*'],
+    cards=CardSpec(
+        'div.products-i',
+        item_id=lambda href: href.split('/')[-1],
+        link='a.products-link',
+        columns=['item_id', 'title', 'url', 'price', 'currency', 'posted'],
+        fields=[
+            FieldSpec('title', 'div.products-name'),
+            FieldSpec('price', 'span.price-val', post='compact'),
+            FieldSpec('currency', 'span.price-cur'),
+            FieldSpec('posted', 'div.products-created', post='day'),
+        ],
+        watch=['title', 'price', 'currency', 'posted'],
+    ),
+)
@@ -0,0 +1,215 @@
+import copy
+import datetime
+import hashlib
+import json
+import re
+from urllib.parse import parse_qs, urljoin, urlparse
+
+from scraping_core.parsing import ExtractionPlan, Field, Selector
+
+ALL = None  # FieldSpec index that hands every match to `take`
+
+
+class Pairs:
+    """Label/value pairs, one per matched row (e.g. a property table)."""
+
+    def __init__(self, label, value):
+        self.label = Selector(label)
+        self.value = Selector(value)
+
+    def __call__(self, backend, rows):
+        pairs = {}
+        for row in rows:
+            label = self.label.select_one(backend, row)
+            value = self.value.select_one(backend, row)
+            if label is not None and value is not None:
+                pairs[backend.text(label).strip()] = backend.text(value).strip()
+        return pairs
+
+
+class Join:
+    """Stripped text of every `child` inside the node, one per line."""
+
+    def __init__(self, child, separator="\n"):
+        self.child = Selector(child)
+        self.separator = separator
+
+    def __call__(self, backend, node):
+        return self.separator.join(backend.text(child).strip() for child in self.child.select(backend, node))
+
+
+class Nested:
+    """Text of the `index`-th `child` inside the node."""
+
+    def __init__(self, child, index=0):
+        self.child = Selector(child)
+        self.index = index
+
+    def __call__(self, backend, node):
+        children = self.child.select(backend, node)
+        return backend.text(children[self.index]).strip() if len(children) > self.index else None
+
+
+def _map_query(value):
+    params = parse_qs(urlparse(value).query)
+    return params['q'][0].split(',') if 'q' in params else None
+
+
+_RELATIVE_DAYS = ((0, ('bugün', 'сегодня', 'today')), (1, ('dünən', 'вчера', 'yesterday')))
+
+
+def _absolute_day(value):
+    """Replace "today"/"yesterday" (az, ru, en) with the date, so a card reads the same tomorrow."""
+    today = datetime.date.today()
+    for days_ago, words in _RELATIVE_DAYS:
+        day = (today - datetime.timedelta(days=days_ago)).isoformat()
+        for word in words:
+            value = re.sub(word, day, value, flags=re.IGNORECASE)
+    return value
+
+
+POSTPROCESSORS = {
+    'compact': lambda value: re.sub(r'\s+', '', value),
+    'tel': lambda value: value.replace('tel:', '').strip(),
+    'tel_digits': lambda value: value.replace('tel:', '').replace('-', '').replace(' ', ''),
+    'json': lambda value: json.dumps(value, ensure_ascii=False),
+    'map_lat': lambda value: float(_map_query(value)[0]) if _map_query(value) else None,
+    'map_lng': lambda value: float(_map_query(value)[1]) if _map_query(value) else None,
+    'day': _absolute_day,
+}
+
+
+class FieldSpec:
+    """Declarative field: which node to select, what to take from it and how to clean it up.
+
+    `take` is 'text', '@attribute' or a callable `(backend, node) -> value`
+    such as Pairs/Join/Nested; with `index=ALL` the callable gets every match.
+    `post` names one or more POSTPROCESSORS (or callables) applied in order.
+    """
+
+    def __init__(self, name, selector, take='text', index=0, post=()):
+        self.name = name
+        self.selector = selector
+        self.take = take
+        self.index = index
+        self.post = (post,) if isinstance(post, str) or callable(post) else tuple(post)
+
+    def clean(self, value):
+        """`value` run through this field's `post` steps, as if it had been extracted."""
+        for step in self.post:
+            if value is None:
+                break
+            value = (POSTPROCESSORS[step] if isinstance(step, str) else step)(value)
+        return value
+
+    def compile(self):
+        take, index = self.take, self.index
+        steps = [POSTPROCESSORS[step] if isinstance(step, str) else step for step in self.post]
+        if take == 'text':
+            take = lambda backend, node: backend.text(node).strip()
+        elif isinstance(take, str) and take.startswith('@'):
+            attribute = take[1:]
+            take = lambda backend, node: backend.attr(node, attribute)
+
+        def extract(backend, nodes):
+            if index is ALL:
+                value = take(backend, nodes)
+            elif len(nodes) > index:
+                value = take(backend, nodes[index])
+            else:
+                return None
+            for step in steps:
+                if value is None:
+                    break
+                value = step(value)
+            return value
+
+        return Field(self.name, self.selector, extract, many=index is ALL or index > 0)
+
+
+class CardSpec:
+    """A listing card on an index page, read without opening the listing.
+
+    Every node matching `selector` is one card; the href of its first `link`
+    identifies the item (`item_id(href)` turns it into the id). `fields` are
+    FieldSpecs evaluated inside the card. A card's fingerprint hashes its
+    `watch` columns (every field by default); it changes when the listing is
+    edited or bumped, which is what the index-only and recrawl modes compare.
+    """
+
+    def __init__(self, selector, item_id, columns, fields, link='a', watch=None):
+        self.selector = Selector(selector)
+        self.link = Selector(link)
+        self.item_id = item_id
+        self.columns = tuple(columns)
+        self.fields = tuple(fields)
+        self.watch = tuple(watch) if watch is not None else tuple(field.name for field in self.fields)
+        self.plan = ExtractionPlan(field.compile() for field in self.fields)
+
+    def extract(self, html, backend, page_url):
+        cards = []
+        for node in self.selector.select(backend, backend.parse(html)):
+            link = node if self.link.matches(backend, node) else self.link.select_one(backend, node)
+            href = backend.attr(link, 'href') if link is not None else None
+            if not href:
+                continue
+            values = self.plan.extract_node(backend, node)
+            values['item_id'] = self.item_id(href)
+            values['url'] = urljoin(page_url, href)
+            cards.append({column: values.get(column) for column in self.columns})
+        return cards
+
+    def fingerprint(self, card):
+        watched = json.dumps([card.get(column) for column in self.watch], ensure_ascii=False)
+        return hashlib.sha1(watched.encode('utf-8')).hexdigest()[:16]
+
+
+class SiteSpec:
+    """Everything the shared core needs to know about one marketplace.
+
+    The detail fields are compiled into an ExtractionPlan once, when the spec
+    is created. `columns` fixes the order of the output record; `item_id` and
+    `url` are filled in by the caller. `browser_allow` lists URLs a lean
+    browser profile must never block. `cards` (a CardSpec) describes the
+    index grid for the index-only mode. `at(base_url)` moves the whole site
+    to another origin, such as a local mock_site server. A `phone_number`
+    passed to `extract()` (e.g. from the phone reveal request) is cleaned up
+    like the one the page itself shows, so both paths write the same number.
+    """
+
+    def __init__(self, name, base_url, columns, fields, phone_reveal=None, browser_allow=(), cards=None):
+        self.name = name
+        self.base_url = base_url
+        self.columns = tuple(columns)
+        self.fields = tuple(fields)
+        self.phone_reveal = phone_reveal
+        self.browser_allow = tuple(browser_allow)
+        self.cards = cards
+        self.plan = ExtractionPlan(field.compile() for field in self.fields)
+
+    def extract(self, html, url, item_id, backend, phone_number=None):
+        values = self.plan.extract(html, backend)
+        values['item_id'] = item_id
+        values['url'] = url
+        if phone_number is not None:
+            field = next((field for field in self.fields if field.name == 'phone_number'), None)
+            values['phone_number'] = field.clean(phone_number) if field is not None else phone_number
+        return {column: values.get(column) for column in self.columns}
+
+    def at(self, base_url):
+        """This spec with every URL under `base_url` instead of the site's own; unchanged when it is empty."""
+        base_url = (base_url or '').rstrip('/')
+        if not base_url or base_url == self.base_url:
+            return self
+        moved = copy.copy(self)
+        moved.base_url = base_url
+        moved.browser_allow = tuple(pattern.replace(self.base_url, base_url) for pattern in self.browser_allow)
+        if self.phone_reveal is not None:
+            moved.phone_reveal = copy.copy(self.phone_reveal)
+            moved.phone_reveal.url_template = self.phone_reveal.url_template.replace(self.base_url, base_url)
+        return moved
+
+    @property
+    def card_columns(self):
+        """Output columns of the index-only mode: the detail columns, the card-only ones and the row's source."""
+        return self.columns + tuple(column for column in self.cards.columns if column not in self.columns) + ('source',)
@@ -0,0 +1,183 @@
+import ctypes
+import os
+import sys
+import threading
+import time
+
+import psutil
+
+BROWSER_NAMES = ('chrome', 'chromedriver', 'chrome_crashpad_handler', 'google-chrome', 'chromium',
+                 'chrome.exe', 'chromedriver.exe')
+_PR_SET_CHILD_SUBREAPER = 36
+
+
+def _become_subreaper():
+    """Have orphaned descendants re-parented to this process instead of init (Linux only)."""
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.prctl(_PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+def _tree(pid):
+    try:
+        root = psutil.Process(pid)
+        return [root] + root.children(recursive=True)
+    except psutil.Error:
+        return []
+
+
+def kill_tree(processes, timeout=3):
+    """Terminate `processes`, then kill whatever is still alive after `timeout` seconds."""
+    for proc in processes:
+        try:
+            proc.terminate()
+        except psutil.Error:
+            pass
+    _, alive = psutil.wait_procs(processes, timeout=timeout)
+    for proc in alive:
+        try:
+            proc.kill()
+        except psutil.Error:
+            pass
+    psutil.wait_procs(alive, timeout=timeout)
+
+
+class BrowserSupervisor:
+    """Owns the Chrome process trees started by this process and keeps them within a memory budget.
+
+    `launch(start)` starts a session with `start()` and tracks the chromedriver
+    behind it; `quit(driver)` quits it and then kills anything left of its
+    process tree. `reap()` kills browser processes that were orphaned by a
+    crashed chromedriver: on Linux the process registers as a child
+    subreaper on its first launch, so such orphans are re-parented to it and
+    can be found by parent PID. The registration is not inherited across
+    fork(), so a forked worker registers on its own first launch. While any session is being launched its chromedriver is not
+    tracked yet, so `reap()` leaves every browser alone until it is. `over_budget()` is true
+    while the RSS of this process plus its browsers exceeds `rss_budget_mb`.
+    """
+
+    def __init__(self, rss_budget_mb=None, check_interval=5.0):
+        self.rss_budget = rss_budget_mb * 1024 * 1024 if rss_budget_mb else None
+        self.check_interval = check_interval
+        self._subreaper_pid = None
+        self.reaped = 0
+        self.recycled = 0
+        self._drivers = {}
+        self._launching = 0
+        self._lock = threading.Lock()
+        self._rss = 0
+        self._checked = 0.0
+
+    @property
+    def subreaper(self):
+        """Whether the current process is registered as a child subreaper."""
+        return self._subreaper_pid == os.getpid()
+
+    @staticmethod
+    def _driver_pid(driver):
+        process = getattr(getattr(driver, 'service', None), 'process', None)
+        return getattr(process, 'pid', None)
+
+    def track(self, driver):
+        pid = self._driver_pid(driver)
+        if pid is not None:
+            with self._lock:
+                self._drivers[id(driver)] = pid
+        return driver
+
+    def launch(self, start):
+        """Start a session with `start()` and track it; `reap()` skips its processes while it starts."""
+        with self._lock:
+            self._launching += 1
+            if self._subreaper_pid != os.getpid() and _become_subreaper():
+                self._subreaper_pid = os.getpid()
+        try:
+            return self.track(start())
+        finally:
+            with self._lock:
+                self._launching -= 1
+
+    def quit(self, driver):
+        with self._lock:
+            pid = self._drivers.pop(id(driver), None)
+        # Snapshot the tree first: once chromedriver exits its children can no longer be found from it.
+        tree = _tree(pid) if pid is not None else []
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error quitting driver: {e}")
+        finally:
+            kill_tree([proc for proc in tree if proc.is_running()])
+            self._checked = 0.0  # memory was just freed; measure again on the next check
+
+    def tracked_pids(self):
+        with self._lock:
+            return set(self._drivers.values())
+
+    def reap(self):
+        """Kill orphaned browser processes and collect their exit status."""
+        me = psutil.Process()
+        orphans = []
+        # Under the lock, so no launch can start a chromedriver between the check and the scan.
+        with self._lock:
+            if self._launching:
+                return 0
+            tracked = set(self._drivers.values())
+            for proc in me.children():
+                if proc.pid in tracked:
+                    continue
+                try:
+                    if proc.name() in BROWSER_NAMES:
+                        orphans.append(proc)
+                except psutil.ZombieProcess:
+                    # Already dead; it only needs its exit status collected.
+                    orphans.append(proc)
+                except psutil.Error:
+                    pass
+        if not orphans:
+            return 0
+        doomed = []
+        for proc in orphans:
+            doomed.extend(_tree(proc.pid))
+        kill_tree(doomed)
+        for proc in orphans:
+            try:
+                os.waitpid(proc.pid, os.WNOHANG)
+            except (ChildProcessError, AttributeError):
+                pass
+        self.reaped += len(orphans)
+        print(f"Reaped {len(orphans)} orphaned browser processes")
+        return len(orphans)
+
+    def rss(self):
+        """RSS in bytes of this process and every tracked browser tree, sampled at most every `check_interval`."""
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return self._rss
+        total = 0
+        for proc in [psutil.Process()] + [p for pid in self.tracked_pids() for p in _tree(pid)]:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        self._rss, self._checked = total, now
+        return total
+
+    def over_budget(self):
+        return self.rss_budget is not None and self.rss() > self.rss_budget
+
+    def stats(self):
+        return {
+            'rss_mb': round(self.rss() / 1024 / 1024),
+            'budget_mb': round(self.rss_budget / 1024 / 1024) if self.rss_budget else None,
+            'browsers': len(self.tracked_pids()),
+            'recycled': self.recycled,
+            'reaped': self.reaped,
+        }
+
+    def report(self):
+        print(f"Browser supervisor: {self.stats()}")
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class TabPool:
+    """Listings opened as tabs of a few shared Chromium processes, driven by Playwright's async API.
+
+    Every job gets a fresh browser context (its own cookies and storage, like a
+    reset DriverPool session) with a single page, in the least busy of
+    `browsers` processes, with at most `tabs_per_browser` open in each. Page
+    loads and waits are interleaved on the event loop instead of parking one
+    thread per browser. Requests the `profile` blocks are aborted before they
+    leave the browser; a browser that crashed is relaunched on next use.
+    With `metrics`, opening a tab and navigating are timed.
+    """
+
+    def __init__(self, browsers=2, tabs_per_browser=10, profile=None, rate_limit=None, metrics=None):
+        self.browsers = browsers
+        self.tabs_per_browser = tabs_per_browser
+        self.profile = profile
+        self.rate_limit = rate_limit
+        self.metrics = metrics
+        self._playwright = None
+        self._browsers = []
+        self._load = []
+        self._available = None
+
+    async def _launch(self):
+        headless = self.profile.headless if self.profile is not None else True
+        arguments = self.profile.arguments() if self.profile is not None else []
+        return await self._playwright.chromium.launch(headless=headless, args=arguments)
+
+    async def __aenter__(self):
+        # Optional dependency, only needed in Playwright mode.
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._browsers = list(await asyncio.gather(*(self._launch() for _ in range(self.browsers))))
+        self._load = [0] * self.browsers
+        self._available = asyncio.Semaphore(self.browsers * self.tabs_per_browser)
+        return self
+
+    async def __aexit__(self, *exc):
+        for browser in self._browsers:
+            try:
+                await browser.close()
+            except Exception as e:
+                print(f"Error closing browser: {e}")
+        await self._playwright.stop()
+
+    async def _route(self, route):
+        request = route.request
+        if self.profile.blocks(request.url, request.resource_type):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _context(self, index):
+        if not self._browsers[index].is_connected():
+            print("Browser disconnected, relaunching it")
+            self._browsers[index] = await self._launch()
+        options = {}
+        if self.profile is not None:
+            width, height = self.profile.window_size
+            options['viewport'] = {'width': width, 'height': height}
+            options['ignore_https_errors'] = '--ignore-certificate-errors' in self.profile.extra_args
+        context = await self._browsers[index].new_context(**options)
+        if self.profile is not None:
+            await context.route('**/*', self._route)
+        return context
+
+    def _observe(self, stage, start):
+        if self.metrics is not None:
+            self.metrics.observe(stage, time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def page(self):
+        start = time.perf_counter()
+        async with self._available:
+            index = min(range(len(self._browsers)), key=self._load.__getitem__)
+            self._load[index] += 1
+            context = None
+            try:
+                context = await self._context(index)
+                page = await context.new_page()
+                self._observe('tab_open', start)
+                yield page
+            finally:
+                self._load[index] -= 1
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        print(f"Error closing browser context: {e}")
+
+    async def navigate(self, page, url):
+        if self.rate_limit is not None:
+            await self.rate_limit.wait(url)
+        wait_until = 'domcontentloaded' if self.profile is None or self.profile.page_load_strategy == 'eager' else 'load'
+        start = time.perf_counter()
+        await page.goto(url, wait_until=wait_until)
+        self._observe('navigate', start)
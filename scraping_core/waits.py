@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import deque
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+class LatencyTracker:
+    """Rolling window of how long a wait took, plus lifetime counters."""
+
+    def __init__(self, window=500):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.timeouts = 0
+        self.total = 0.0
+
+    def record(self, seconds, timed_out=False):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+            if timed_out:
+                self.timeouts += 1
+
+    def percentile(self, q):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def __len__(self):
+        return len(self._samples)
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'timeouts': self.timeouts,
+            'mean': round(self.total / self.count, 3) if self.count else None,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+        }
+
+
+class Waiter:
+    """Readiness-driven waits whose timeouts follow a site's observed latency.
+
+    Every wait returns as soon as its condition holds. Until `min_samples`
+    waits have been seen for a key the timeout is `default_timeout`; after
+    that it is the p99 latency times `headroom`, clamped to
+    [`min_timeout`, `max_timeout`]. Timed-out waits are recorded at their
+    full timeout so a slowing site pushes the timeout back up. With
+    `metrics` every wait is also recorded as a `wait:<selector>` stage.
+    """
+
+    def __init__(self, site, default_timeout=10, min_timeout=2, max_timeout=30,
+                 headroom=2.0, min_samples=20, poll=0.1, metrics=None):
+        self.site = site
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self.poll = poll
+        self.metrics = metrics
+        self._trackers = {}
+        self._lock = threading.Lock()
+
+    def tracker(self, key):
+        with self._lock:
+            if key not in self._trackers:
+                self._trackers[key] = LatencyTracker()
+            return self._trackers[key]
+
+    def _record(self, key, seconds, timed_out=False):
+        self.tracker(key).record(seconds, timed_out)
+        if self.metrics is not None:
+            self.metrics.observe('wait:' + key, seconds)
+            if timed_out:
+                self.metrics.count('wait_timeouts')
+
+    def timeout(self, key):
+        tracker = self.tracker(key)
+        if len(tracker) < self.min_samples:
+            return self.default_timeout
+        return min(self.max_timeout, max(self.min_timeout, tracker.percentile(0.99) * self.headroom))
+
+    def wait_until(self, driver, condition, key):
+        timeout = self.timeout(key)
+        start = time.monotonic()
+        try:
+            result = WebDriverWait(driver, timeout, poll_frequency=self.poll).until(condition)
+        except TimeoutException:
+            self._record(key, time.monotonic() - start, timed_out=True)
+            raise
+        self._record(key, time.monotonic() - start)
+        return result
+
+    def wait_for(self, driver, by, selector, clickable=False):
+        condition = EC.element_to_be_clickable if clickable else EC.presence_of_element_located
+        return self.wait_until(driver, condition((by, selector)), key=selector)
+
+    @staticmethod
+    def network_idle(idle=0.5):
+        """Condition that holds once the document has loaded and no resource finished loading for `idle` seconds."""
+        state = {'count': -1, 'since': time.monotonic()}
+
+        def network_idle(d):
+            ready, count = d.execute_script(
+                "return [document.readyState, performance.getEntriesByType('resource').length]")
+            now = time.monotonic()
+            if count != state['count']:
+                state['count'], state['since'] = count, now
+                return False
+            return ready == 'complete' and now - state['since'] >= idle
+
+        return network_idle
+
+    def wait_for_network_idle(self, driver, idle=0.5, key='network-idle'):
+        return self.wait_until(driver, self.network_idle(idle), key)
+
+    async def wait_for_selector(self, page, selector, state='attached'):
+        """Playwright counterpart of `wait_for`, sharing its latency tracking and timeouts."""
+        timeout = self.timeout(selector)
+        start = time.monotonic()
+        try:
+            result = await page.wait_for_selector(selector, state=state, timeout=timeout * 1000)
+        except Exception:
+            self._record(selector, time.monotonic() - start, timed_out=True)
+            raise
+        self._record(selector, time.monotonic() - start)
+        return result
+
+    def stats(self):
+        with self._lock:
+            trackers = dict(self._trackers)
+        return {key: tracker.summary() for key, tracker in trackers.items()}
+
+    def report(self):
+        for key, summary in self.stats().items():
+            print(f"[{self.site}] wait {key}: {summary}")
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    queue TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (queue, payload)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (queue, status);
+CREATE TABLE IF NOT EXISTS sealed (
+    queue TEXT PRIMARY KEY
+);
+"""
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """Job queue in a SQLite file shared by any number of worker processes on one machine.
+
+    Jobs are JSON payloads leased for `lease_seconds`; a job whose worker
+    died without acking it becomes leasable again once the lease expires,
+    up to `max_attempts` times. Only the worker holding a job's lease can ack
+    it, so a worker whose lease expired cannot ack a job another worker has
+    taken over. A queue is drained once it is sealed (no more jobs will be
+    added) and nothing is pending or leased. The file must be on a local
+    disk: the queue runs in WAL mode, whose shared memory index does not
+    work over a network filesystem. Payloads are unique per queue, so a new
+    crawl must `reset()` the queue before seeding it again.
+    """
+
+    def __init__(self, path, lease_seconds=900, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def enqueue(self, queue, payloads):
+        with self._lock:
+            rows = [(queue, json.dumps(payload)) for payload in payloads]
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                before = self._conn.total_changes
+                self._conn.executemany("INSERT OR IGNORE INTO jobs (queue, payload) VALUES (?, ?)", rows)
+                added = self._conn.total_changes - before
+                sealed = self._conn.execute("SELECT 1 FROM sealed WHERE queue = ?", (queue,)).fetchone()
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        if rows and not added and sealed:
+            print(f"Queue {queue} in {self.path} is sealed and already holds all {len(rows)} jobs; nothing added "
+                  f"(reset it to crawl again)")
+        return added
+
+    def reset(self, queue):
+        """Forget every job of `queue` and unseal it, for a new crawl."""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute("DELETE FROM jobs WHERE queue = ?", (queue,))
+                self._conn.execute("DELETE FROM sealed WHERE queue = ?", (queue,))
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def seal(self, queue):
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO sealed VALUES (?)", (queue,))
+
+    def lease(self, queue, owner, count=1):
+        with self._lock:
+            now = time.time()
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed' WHERE queue = ? AND status = 'leased' "
+                    "AND lease_until < ? AND attempts >= ?", (queue, now, self.max_attempts))
+                rows = self._conn.execute(
+                    "SELECT id, payload FROM jobs WHERE queue = ? "
+                    "AND (status = 'pending' OR (status = 'leased' AND lease_until < ?)) "
+                    "ORDER BY id LIMIT ?", (queue, now, count)).fetchall()
+                self._conn.executemany(
+                    "UPDATE jobs SET status = 'leased', owner = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                    [(owner, now + self.lease_seconds, job_id) for job_id, _ in rows])
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            return [json.loads(payload) for _, payload in rows]
+
+    def ack(self, queue, payload, status='done', owner=None):
+        """Mark a job leased by `owner` (default: this worker, as in `leased()`) as `status`."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, lease_until = NULL WHERE queue = ? AND payload = ? "
+                "AND status = 'leased' AND owner = ?", (status, queue, json.dumps(payload), owner or worker_id()))
+
+    def drained(self, queue):
+        with self._lock:
+            if not self._conn.execute("SELECT 1 FROM sealed WHERE queue = ?", (queue,)).fetchone():
+                return False
+            return not self._conn.execute(
+                "SELECT 1 FROM jobs WHERE queue = ? AND status IN ('pending', 'leased') LIMIT 1", (queue,)).fetchone()
+
+    def counts(self, queue):
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE queue = ? GROUP BY status", (queue,)).fetchall())
+
+    async def leased(self, queue, owner=None, poll=2.0):
+        """Yield payloads leased one at a time until the queue is drained."""
+        owner = owner or worker_id()
+        while True:
+            jobs = await asyncio.to_thread(self.lease, queue, owner)
+            if jobs:
+                yield jobs[0]
+            elif await asyncio.to_thread(self.drained, queue):
+                return
+            else:
+                await asyncio.sleep(poll)
+
+    def close(self):
+        self._conn.close()
+
+
+def start_processes(target, count, *args):
+    """Start `target(index, *args)` in `count` worker processes."""
+    processes = [multiprocessing.Process(target=target, args=(index,) + args) for index in range(count)]
+    for process in processes:
+        process.start()
+    return processes
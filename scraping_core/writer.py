@@ -0,0 +1,165 @@
+import asyncio
+import csv
+import os
+import time
+
+
+class _Marker:
+    __slots__ = ('callback',)
+
+    def __init__(self, callback):
+        self.callback = callback
+
+
+class BufferedWriter:
+    """Single writer task that owns an output file.
+
+    Rows are queued with `put()` (which waits when the bounded queue is full)
+    and written in batches of `batch_size` or every `flush_interval`
+    seconds, whichever comes first. Only this task touches the file, so rows
+    never interleave, and every row follows the fixed `columns` schema.
+    `on_flush(rows)` is called after each batch is on disk. `normalize(rows)`
+    (e.g. records.normalize_batch) turns each batch into typed records before
+    it is written; `on_flush` still gets the rows as they were put. With
+    `metrics` batch writes are timed and the queue length is exposed as a gauge.
+    If a batch fails to write, the writer task stops and its error is raised
+    from the next `put()` and from leaving the `async with` block.
+    Subclasses implement `_open`, `_write(batch)` and `_close`.
+    """
+
+    def __init__(self, path, columns, batch_size=500, flush_interval=5.0, queue_size=10000, on_flush=None,
+                 normalize=None, metrics=None):
+        self.path = path
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.normalize = normalize
+        self.metrics = metrics
+        self.rows_written = 0
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self._task = None
+
+    async def __aenter__(self):
+        await asyncio.to_thread(self._open)
+        if self.metrics is not None:
+            self.metrics.gauge('writer_queue', self._queue.qsize)
+            self.metrics.gauge('rows_written', lambda: self.rows_written)
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc):
+        try:
+            await self._send(None)
+            await self._task
+        finally:
+            await asyncio.to_thread(self._close)
+
+    async def put(self, row):
+        await self._send(row)
+
+    async def after_flush(self, callback):
+        """Run `callback()` once every row queued before it is on disk."""
+        await self._send(_Marker(callback))
+
+    async def _send(self, item):
+        """Queue `item`, raising the writer task's error rather than waiting on a queue nobody drains."""
+        if self._task.done():
+            self._task.result()
+            raise RuntimeError(f"The writer for {self.path} has stopped")
+        try:
+            self._queue.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            pass
+        sending = asyncio.ensure_future(self._queue.put(item))
+        try:
+            await asyncio.wait([sending, self._task], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            queued = sending.done()
+            if not queued:
+                sending.cancel()
+        if not queued:
+            self._task.result()
+            raise RuntimeError(f"The writer for {self.path} has stopped")
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _write(self, batch):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+    def _write_batch(self, rows):
+        if self.normalize is not None:
+            start = time.perf_counter()
+            rows = self.normalize(rows)
+            if self.metrics is not None:
+                self.metrics.observe('normalize', time.perf_counter() - start)
+        self._write(rows)
+
+    async def _run(self):
+        closing = False
+        while not closing:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    closing = True
+                    break
+                batch.append(row)
+            rows = [row for row in batch if not isinstance(row, _Marker)]
+            if rows:
+                start = time.perf_counter()
+                await asyncio.to_thread(self._write_batch, rows)
+                if self.metrics is not None:
+                    self.metrics.observe('write', time.perf_counter() - start)
+                self.rows_written += len(rows)
+                if self.on_flush is not None:
+                    self.on_flush(rows)
+            for marker in batch:
+                if isinstance(marker, _Marker):
+                    marker.callback()
+
+
+class CsvWriter(BufferedWriter):
+    """CSV output with a header row; appends to an existing file only if its header matches `columns`."""
+
+    def _open(self):
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if not new_file:
+            with open(self.path, newline='', encoding='utf-8') as f:
+                header = next(csv.reader(f), [])
+            if header != self.columns:
+                raise ValueError(f"{self.path} has the columns {header}, not {self.columns}; "
+                                 f"move it aside or write to another file")
+        self._file = open(self.path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction='ignore')
+        if new_file:
+            self._writer.writeheader()
+
+    def _write(self, batch):
+        self._writer.writerows(batch)
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+def make_writer(output_format, stem, columns, **kwargs):
+    """Writer for `<stem>.csv` or `<stem>.parquet`."""
+    if output_format == 'csv':
+        return CsvWriter(stem + '.csv', columns, **kwargs)
+    if output_format == 'parquet':
+        from scraping_core.parquet_sink import ParquetWriter
+        return ParquetWriter(stem + '.parquet', columns, **kwargs)
+    raise ValueError(f"Unknown output format: {output_format}")
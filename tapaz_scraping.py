@@ -1,298 +1,353 @@
-import gc
 import os
 import time
-import pandas as pd
 import asyncio
+from contextlib import nullcontext
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-import re
-from selenium.webdriver.chrome.service import Service as ChromeService
 from concurrent.futures import ThreadPoolExecutor
-from webdriver_manager.chrome import ChromeDriverManager
-import json
-from urllib.parse import urlparse, parse_qs
-from selenium.webdriver.common.keys import Keys
-
-def extract_price(link_soup):
-    try:
-        price_div = link_soup.find('div', class_='product-price__i product-price__i--bold')
-        if price_div:
-            price_val = price_div.find('span', class_='price-val')
-            price_cur = price_div.find('span', class_='price-cur')
-            if price_val and price_cur:
-                price = re.sub(r'\s+', '', price_val.text.strip())  # Remove whitespace from the price value
-                currency = price_cur.text.strip()
-                return price, currency
-    except Exception:
-        pass
-    return None, None
-
-
-def extract_information(link_soup):
-    try:
-        informations = link_soup.findAll('div', class_='product-properties__i')
-        information = {}
-        for info in informations:
-            label_element = info.find('label', class_='product-properties__i-name')
-            value_element = info.find('span', class_='product-properties__i-value')
-            if label_element and value_element:
-                label = label_element.text.strip() if label_element is not None else "Unknown Label"
-                value = value_element.text.strip() if value_element is not None else "No Value"
-                information[label] = value
-        return json.dumps(information, ensure_ascii=False)
-    except Exception as e:
-        # print(f"An error occurred: {e}")
-        pass
-        return None
-
-
-def extract_owner_name(link_soup):
-    try:
-        owner_name_div = link_soup.find('span', class_='product-shop__owner-name')
-        if owner_name_div:
-            owner_name = owner_name_div.text.strip()
-            return owner_name
-    except Exception:
-        pass
-    return None
-
-
-def extract_content(link_soup):
-    try:
-        # Find the specific div containing the content
-        content_div = link_soup.find('div', class_='product-description__content')
-        if content_div:
-            # Extract text from all <p> tags and join them
-            paragraphs = content_div.find_all('p')
-            content = "\n".join(p.get_text(strip=True) for p in paragraphs)
-            return content
-    except Exception as e:
-        print(f"An error occurred: {e}")
-    return None
-
-
-def extract_statistics(link_soup):
-    try:
-        statistics = link_soup.find_all('span', class_='product-info__statistics__i-text')
-        created_date = statistics[1].text.strip() if statistics else None
-        views = statistics[2].text.strip() if statistics else None
-        return created_date, views
-    except Exception:
-        pass
-    return None, None
-
-
-def extract_owner_number(link_soup):
-    try:
-        phone_item_div = link_soup.find('li', class_='phone-numbers__i')
-        phone_item = phone_item_div.find('a') if phone_item_div else None
-        if phone_item and 'href' in phone_item.attrs:
-            phone_number = phone_item['href'].replace('tel:', '').strip()
-        else:
-            phone_number = None
-        return phone_number
-    except Exception as e:
-        print(f"An error occurred: {e}")  # Xətanın mesajını çap edin
-        return None
-
-
+from scraping_core.concurrency import AdaptiveLimiter
+from scraping_core.metrics import Metrics
+from scraping_core.browser_profile import BrowserProfile
+from scraping_core.driver_pool import DriverPool
+from scraping_core.tab_pool import TabPool
+from scraping_core.drivers import chrome_service
+from scraping_core.supervisor import BrowserSupervisor
+from scraping_core.http_client import HttpClient
+from scraping_core.writer import make_writer
+from scraping_core.records import normalize_batch
+from scraping_core.archive import HtmlArchive
+from scraping_core.changelog import Changelog
+from scraping_core.crawl_state import CrawlState
+from scraping_core.feeds import HttpFeed, ScrollFeed
+from scraping_core.pipeline import Pipeline
+from scraping_core.resilience import DomainLimiter, Retrier
+from scraping_core.runner import crawl_arguments, run_crawl
+from scraping_core.work_queue import WorkQueue
+from scraping_core.phone_reveal import fetch_listing
+from scraping_core.waits import Waiter
+from scraping_core.sites.tapaz import TAPAZ
+from scraping_core.parsing import get_backend
+
+SITE = TAPAZ.at(os.environ.get('TAPAZ_BASE_URL'))  # e.g. a local scraping_core.mock_site
+METRICS = Metrics(SITE.name)  # stage timings, success/failure counters and live gauges
+METRICS_PORT = 9301  # serve /metrics on localhost (worker N on port + N); None to disable
+METRICS_LOG_INTERVAL = 60  # seconds between structured metrics log lines
+MAX_CONCURRENCY = 30  # ceiling for detail fetches, drivers and threads
+MAX_PAGES_PER_DRIVER = 50
+RSS_BUDGET_MB = 8192  # this process plus its browsers; drivers are recycled above it
+SUPERVISOR = BrowserSupervisor(rss_budget_mb=RSS_BUDGET_MB)
+BROWSER_MODE = 'selenium'  # or 'playwright': listings open as tabs of a few shared browsers
+TABS_PER_BROWSER = 10
+BROWSER = BrowserProfile(allow=SITE.browser_allow, extra_args=['--ignore-certificate-errors'])
+HTTP_CONNECTIONS_PER_HOST = 8
+HTTP_DETAIL = True  # fetch listings and phones without a browser, falling back to Chrome
+PREWARM_DRIVERS = not HTTP_DETAIL  # Chrome is only a fallback while listings come over HTTP
+CONCURRENCY = AdaptiveLimiter(SITE.name, maximum=MAX_CONCURRENCY)
+RATE_LIMIT = DomainLimiter(rate=5, burst=10)  # requests per second to each host
+RETRIES = Retrier(SITE.name, attempts=3)
+MAX_ITEM_ATTEMPTS = 5  # listings that failed this many times are left out of --retry-failed
+WAITS = Waiter(SITE.name, default_timeout=10, metrics=METRICS)
+PARSER_BACKEND = 'lxml'  # 'selectolax', 'lxml' or 'bs4' (the reference backend)
+OUTPUT_FORMAT = 'csv'  # or 'parquet' for typed, columnar output
+# Rows are written typed: floats, ints and ISO dates rather than the page text. Start a new output file
+# when switching, as older files hold page text; None writes the page text as before.
+NORMALIZE = normalize_batch
+INDEX_ONLY = False  # write rows straight from the feed's cards instead of opening every listing
+ENRICH = 'changed'  # with INDEX_ONLY: open the detail page of 'new', 'changed' or 'none' of the cards
+RECRAWL = False  # refetch only new or changed cards and write an insert/update/delete changelog
+STATE_PATH = 'crawl_state.sqlite'  # finished pages and scraped items, for resuming
+ARCHIVE_HTML = False  # keep every fetched listing page in ARCHIVE, so --reparse can re-extract it
+ARCHIVE = HtmlArchive('html_archive', SITE.name)
+FEED_URL = SITE.base_url + '/elanlar'
+FEED_MODE = 'http'  # follow the feed's pagination over HTTP, or 'scroll' it in Chrome
+FEED_NEXT = 'a[rel=next]'
+FEED_TARGET = 5000  # stop discovering once this many products were found
+ITEM_QUEUE_SIZE = 200
+QUEUE_NAME = SITE.name + ':items'
+
+
+def detail_chrome_options():
+    return BROWSER.options()
+
+
+def extract_listing(html, url, item_id, phone_number=None):
+    return SITE.extract(html, url, item_id, get_backend(PARSER_BACKEND), phone_number)
+
+
+def parse_property_info(html, url, item_id, phone_number=None):
+    # Archived before extraction, so pages a broken selector fails on can be reparsed later
+    if ARCHIVE_HTML:
+        with METRICS.span('archive'):
+            ARCHIVE.put(item_id, url, html, phone_number)
+    with METRICS.span('parse'):
+        return extract_listing(html, url, item_id, phone_number)
+
+
+def extract_property_info(url, item_id, pool):
+    # Errors are raised so RETRIES can decide whether the listing is worth another try
+    with pool.driver() as driver:
+        # Saytı açın və səhifənin tam yüklənməsini gözləyin
+        pool.navigate(driver, url)
 
-def extract_date_information(link_soup):
-    try:
-        date_div = link_soup.find_all('div', class_='about-ad-info__date')
-        date1 = date_div[0].find_all('span')[1].text.strip()
-        date2 = date_div[1].find_all('span')[1].text.strip()
-        return date1, date2
-    except Exception:
-        pass
-    return None, None
-
-
-def extract_product_title(link_soup):
-    try:
-        title_div = link_soup.find('h1', class_='product-title')
-        if title_div:
-            title = title_div.text.strip()
-            return title
-    except Exception:
-        pass
-    return None
-
-
-def extract_location(link_soup):
-    try:
-        location_div = link_soup.find('a', class_='shop--location')['href']
-        query = urlparse(location_div).query
-        params = parse_qs(query)
-        if 'q' in params:
-            lat, lng = params['q'][0].split(',')
-            return float(lat), float(lng)
-        else:
-            return None
-    except Exception as e:
-        # print(f"An error occurred: {e}")
-        pass
-    return None, None
+        # 'show-phones' düyməsini gözləyin və klikləyin
+        try:
+            WAITS.wait_for(driver, By.CLASS_NAME, 'show-phones')
+            with METRICS.span('phone_click'):
+                driver.execute_script("document.querySelector('.show-phones').click();")
+            WAITS.wait_for(driver, By.CLASS_NAME, 'phone-numbers__i')
+        except Exception as e:
+            # Keep the listing; it is written without a phone number
+            print(f"Error interacting with the element: {e}")
 
+        # Sayfanın HTML kodunu BeautifulSoup ilə oxuyun
+        with METRICS.span('page_source'):
+            updated_html = driver.page_source
 
-def extract_property_info(url, item_id):
-    try:
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--ignore-certificate-errors')
-        # service = ChromeService(ChromeDriverManager().install(), log_path=os.devnull)
-        driver = webdriver.Chrome(options=chrome_options)
+    return parse_property_info(updated_html, url, item_id)
 
-        # Saytı açın və səhifənin tam yüklənməsini gözləyin
-        driver.get(url)
-        time.sleep(2)
 
-        # 'show-phones' düyməsini gözləyin və klikləyin
+async def extract_property_info_tab(tabs, url, item_id, loop, executor):
+    async with tabs.page() as page:
+        await tabs.navigate(page, url)
         try:
-            driver.execute_script("document.querySelector('.show-phones').click();")
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, 'phone-numbers__i')))
-
-            # print("Waiting for the show button to be clickable.")
-            # WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CLASS_NAME, 'js-show-phones')))
-            # elements = driver.find_element(By.CLASS_NAME, 'js-show-phones')
-            #
-            # if elements:
-            #     elements.click()
-            #     print("Div clicked successfully.")
-            # else:
-            #     print("Show button not found for this listing.")
+            await WAITS.wait_for_selector(page, '.show-phones')
+            async with METRICS.span('phone_click'):
+                await page.evaluate("document.querySelector('.show-phones').click();")
+            await WAITS.wait_for_selector(page, '.phone-numbers__i')
         except Exception as e:
+            # Keep the listing; it is written without a phone number
             print(f"Error interacting with the element: {e}")
-            return None
+        async with METRICS.span('page_source'):
+            updated_html = await page.content()
+    return await loop.run_in_executor(executor, parse_property_info, updated_html, url, item_id)
 
-        # Sayfanın HTML kodunu BeautifulSoup ilə oxuyun
-        updated_html = driver.page_source
-        link_soup = BeautifulSoup(updated_html, 'html.parser')
-
-        # # Məlumatları çıxarın
-        phone_number = extract_owner_number(link_soup)
-        owner_name = extract_owner_name(link_soup)
-        information = extract_information(link_soup)
-        price, cur = extract_price(link_soup)
-        content = extract_content(link_soup)
-        created_date, views = extract_statistics(link_soup)
-        title = extract_product_title(link_soup)
-        lat, lng = extract_location(link_soup)
-        driver.quit()
-
-        df1 = {
-            'item_id': item_id,
-            'title': title,
-            'url': url,
-            'phone_number': phone_number,
-            'owner_name': owner_name,
-            'price': price,
-            'currency': cur,
-            'information': information,
-            'content': content,
-            'views': views,
-            'created_date': created_date,
-            'latitude': lat,
-            'longitude': lng
-        }
-        del item_id,title,url,phone_number,owner_name,price,cur,information,content,views,created_date,lat,lng,driver,link_soup
-        return df1
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
+
+async def extract_property_info_http(http, url, item_id, loop, executor):
+    # Errors are not a reason to open Chrome: they are raised, for RETRIES to decide whether it is worth another try
+    async with METRICS.span('http_listing'):
+        html, phones = await fetch_listing(http, url, item_id, SITE.phone_reveal)
+    if not phones:
+        # The reveal request was refused (e.g. a rejected CSRF token); the button still works in Chrome
         return None
+    return await loop.run_in_executor(executor, parse_property_info, html, url, item_id, phones[0])
+
+
+def open_feed_driver():
+    driver = SUPERVISOR.launch(lambda: webdriver.Chrome(service=chrome_service(), options=BROWSER.options()))
+    BROWSER.apply(driver)
+    driver.get(FEED_URL)
+    return driver
+
+
+async def discover_links(http, loop, executor):
+    """Yield batches of product links as soon as the feed produces them."""
+    found = 0
+    if FEED_MODE == 'http':
+        # Follow the feed's own pagination; listings reach the workers page by page
+        feed = HttpFeed(http, FEED_URL, 'a.products-link', FEED_NEXT, get_backend(PARSER_BACKEND),
+                        target=FEED_TARGET, cards=SITE.cards if INDEX_ONLY or RECRAWL else None, executor=executor)
+        METRICS.gauge('feed_found', lambda: feed.found)
+        for _ in feed.steps():
+            try:
+                async with METRICS.span('feed_page'):
+                    links = await feed.step()
+            except Exception as e:
+                print(f"Could not fetch feed page {feed.next_url}: {e}")
+                continue
+            if links:
+                yield tuple(links)
+        found = feed.found
+        if not found:
+            print("No products found over HTTP, scrolling the feed in Chrome")
+
+    if not found:
+        driver = await loop.run_in_executor(executor, open_feed_driver)
+        try:
+            feed = ScrollFeed(driver, 'a.products-link', WAITS, target=FEED_TARGET)
+            METRICS.gauge('feed_found', lambda: feed.found)
+            for _ in feed.steps():
+                try:
+                    async with METRICS.span('feed_scroll'):
+                        links = await loop.run_in_executor(executor, feed.step)
+                except Exception as e:
+                    print(f"Error scrolling the feed: {e}")
+                    continue
+                if links:
+                    yield tuple(links)
+        finally:
+            SUPERVISOR.quit(driver)
+
+
+async def main(queue_path=None, worker=None, retry_failed=False):
+    pool = DriverPool(CONCURRENCY.limit, detail_chrome_options, max_pages=MAX_PAGES_PER_DRIVER,
+                      rate_limit=RATE_LIMIT, supervisor=SUPERVISOR, on_start=BROWSER.apply, metrics=METRICS)
+    CONCURRENCY.on_change = pool.resize
+    tabs = None
+    if BROWSER_MODE == 'playwright':
+        tabs = TabPool(browsers=-(-MAX_CONCURRENCY // TABS_PER_BROWSER), tabs_per_browser=TABS_PER_BROWSER,
+                       profile=BROWSER, rate_limit=RATE_LIMIT, metrics=METRICS)
+    if PREWARM_DRIVERS and BROWSER_MODE == 'selenium':
+        pool.prewarm()
+    http = HttpClient(per_host=HTTP_CONNECTIONS_PER_HOST, rate_limit=RATE_LIMIT, metrics=METRICS)
+    state = CrawlState(STATE_PATH, SITE.name)
+    METRICS.gauge('concurrency_limit', lambda: CONCURRENCY.limit)
+    METRICS.gauge('retries', lambda: RETRIES.retries)
+    METRICS.gauge('circuit_open', lambda: int(RETRIES.breaker.open))
+    METRICS.start(port=METRICS_PORT + (worker or 0) if METRICS_PORT else None, log_interval=METRICS_LOG_INTERVAL)
+    # The feed stops after FEED_TARGET listings, so a listing missing from it is not known to be
+    # gone: recrawls of tap.az report inserts and updates only.
+    changelog = Changelog(state, SITE.cards) if RECRAWL else None
+
+    unenriched = set()
+
+    def flushed(rows):
+        state.mark_done([row for row in rows if row.get('source', 'detail') == 'detail'])
+        if INDEX_ONLY or RECRAWL:
+            # Rows scraped after a fallback to scrolling have no card fields to fingerprint, and a card whose
+            # enrichment failed must come up as changed again next time, so it is fetched once more
+            state.remember_cards((row['item_id'], SITE.cards.fingerprint(row)) for row in rows
+                                 if 'source' in row and row['item_id'] not in unenriched)
+            unenriched.difference_update(row['item_id'] for row in rows)
+
+    if RECRAWL:
+        writer = make_writer(OUTPUT_FORMAT, "tapaz_changes" if worker is None else f"tapaz_changes.{worker}",
+                             SITE.card_columns + ('change',), on_flush=flushed, normalize=NORMALIZE, metrics=METRICS)
+    elif INDEX_ONLY:
+        # Card rows have their own columns, so they never share a file with detail rows
+        writer = make_writer(OUTPUT_FORMAT, "tapaz_cards" if worker is None else f"tapaz_cards.{worker}",
+                             SITE.card_columns, on_flush=flushed, normalize=NORMALIZE, metrics=METRICS)
+    else:
+        writer = make_writer(OUTPUT_FORMAT, "tapaz" if worker is None else f"tapaz.{worker}",
+                             SITE.columns, on_flush=flushed, normalize=NORMALIZE, metrics=METRICS)
+    queue = WorkQueue(queue_path) if queue_path else None
+
+    async def fetch_detail(link, item_id):
+        async with CONCURRENCY.slot():
+            data = None
+            if HTTP_DETAIL:
+                data = await extract_property_info_http(http, link, item_id, loop, executor)
+            if data is None:
+                if tabs is not None:
+                    data = await extract_property_info_tab(tabs, link, item_id, loop, executor)
+                else:
+                    data = await loop.run_in_executor(executor, extract_property_info, link, item_id, pool)
+            return data
+
+    async def scrape_item(link, item_id):
+        if state.seen(item_id):
+            return
+        try:
+            data = await RETRIES.call(fetch_detail, link, item_id)
+        except Exception as e:
+            print(f"Giving up on {link}: {e}")
+            METRICS.count('failed')
+            state.mark_failed(item_id, link)
+            return
+        await writer.put(data)
+        METRICS.count('scraped')
+
+    def needs_detail(card):
+        if ENRICH == 'new':
+            return not state.seen(card['item_id'])
+        if ENRICH == 'changed':
+            return state.card_change(card['item_id'], SITE.cards.fingerprint(card)) is not None
+        return False
+
+    async def process_card(card):
+        if changelog is not None:
+            card['change'] = changelog.classify(card)
+            if card['change'] is None:
+                return  # unchanged since the last crawl
+        card['source'] = 'card'
+        if changelog is not None or needs_detail(card):
+            try:
+                data = await RETRIES.call(fetch_detail, card['url'], card['item_id'])
+            except Exception as e:
+                print(f"Could not enrich {card['url']}: {e}")
+                METRICS.count('enrich_failed')
+                unenriched.add(card['item_id'])
+                state.mark_failed(card['item_id'], card['url'])
+            else:
+                # Card values are kept, so the fingerprint stored for this row matches the card next time
+                card.update((column, value) for column, value in data.items() if column not in SITE.cards.columns)
+                card['source'] = 'detail'
+        await writer.put(card)
+        METRICS.count('scraped' if card.get('source') == 'detail' else 'cards')
+
+    # Function to process individual items
+    async def process_item(item, batch):
+        # Items are card records in INDEX_ONLY and RECRAWL modes, unless discovery had to fall back to scrolling
+        if isinstance(item, dict):
+            await process_card(item)
+        else:
+            await scrape_item(SITE.base_url + item, item.split('/')[-1])
 
+    async def failed_items(_):
+        return state.failed_items(max_attempts=MAX_ITEM_ATTEMPTS)
 
-async def main():
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')
+    async def retry_item(row, _):
+        await scrape_item(row['url'], row['item_id'])
 
-    # Initialize CSV file if it doesn't exist
-    if not os.path.exists("tapaz.csv"):
-        pd.DataFrame().to_csv("tapaz.csv", sep=',', encoding='utf-8', mode='w', index=False)
+    async def leased_item(job):
+        # process_card fills in the card it is given; the job itself stays as leased, for queue.ack to match it
+        return [dict(job) if isinstance(job, dict) else job]
 
-    semaphore = asyncio.Semaphore(5)  # Limit concurrent connections
+    async def discovered_batch(batch):
+        return list(batch)
 
-    # Function to process individual items
-    async def process_item(item):
-        async with semaphore:
-            link = 'https://tap.az' + item['href']
-            item_id = item['href'].split('/')[-1]
-            data = await loop.run_in_executor(executor, extract_property_info, link, item_id)
-            if data:
-                df = pd.DataFrame([data])
-                df.to_csv("tapaz.csv", sep=',', encoding='utf-8', mode='a', header=False, index=False)
-
-    with ThreadPoolExecutor() as executor:
+    async def item_done(job, items):
+        await writer.after_flush(lambda: queue.ack(QUEUE_NAME, job))
+
+    with state, pool, ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as executor:
         loop = asyncio.get_event_loop()
 
-        service = ChromeService(ChromeDriverManager().install(), log_path=os.devnull)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        url = 'https://tap.az/elanlar'
-        driver.get(url)
-
-        # try:
-        #     WebDriverWait(driver, 10).until(
-        #         EC.presence_of_element_located((By.CLASS_NAME, 'products-i'))
-        #     )
-        # except Exception as e:
-        #     print(f"Error waiting for page load: {e}")
-        #     driver.quit()
-        #     return
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        content = soup.find_all('a', class_='products-link')
-        element = driver.find_element(By.TAG_NAME,"html")
-        # scroll_attempts = 0
-        # max_attempts = 7
-        # last_height = driver.execute_script("return document.body.scrollHeight")
-        while len(content)<5000:
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "html")))
-            element.send_keys(Keys.END)
-            time.sleep(3)  # Wait for content to load
-            element.send_keys(Keys.HOME)
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            content = soup.find_all('a', class_='products-link')
-            print(len(content))
-        # last_height = driver.execute_script("return document.body.scrollHeight")
-        # scroll_attempts = 0
-        # max_attempts = 5  # Limit scrolling attempts to detect the end of content
-        #
-        # while True:
-        #     driver.execute_script("window.scrollBy(0, 50);")
-        #     time.sleep(3)  # Longer delay to allow full content to load
-        #
-        #     new_height = driver.execute_script("return document.body.scrollHeight")
-        #
-        #     # Stop scrolling when no new content appears after several attempts
-        #     if new_height == last_height:
-        #         scroll_attempts += 1
-        #         if scroll_attempts >= max_attempts:
-        #             break
-        #     else:
-        #         scroll_attempts = 0  # Reset if new content loads
-        #
-        #     last_height = new_height
-
-        # Parse page source after scrolling
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        content = soup.find_all('a', class_='products-link')
-
-        # Schedule tasks for each product link
-        tasks = [process_item(item) for item in content]
-        await asyncio.gather(*tasks)
-
-        # Clean up
-        driver.quit()
-        del tasks, soup, driver, service
-        gc.collect()
-
-
-start_time = time.time()
-asyncio.run(main())
-end_time = time.time()
-execution_time = end_time - start_time
-print(f"Execution time: {execution_time} seconds")
+        async with http, writer, tabs or nullcontext():
+            if retry_failed:
+                await Pipeline(failed_items, retry_item, producers=1, consumers=MAX_CONCURRENCY,
+                               queue_size=ITEM_QUEUE_SIZE, metrics=METRICS).run(['failed'])
+            elif queue is not None:
+                pipeline = Pipeline(leased_item, process_item, producers=1, consumers=MAX_CONCURRENCY,
+                                    queue_size=ITEM_QUEUE_SIZE, on_page_done=item_done, metrics=METRICS)
+                await pipeline.run(queue.leased(QUEUE_NAME))
+            else:
+                pipeline = Pipeline(discovered_batch, process_item, producers=1, consumers=MAX_CONCURRENCY,
+                                    queue_size=ITEM_QUEUE_SIZE, metrics=METRICS)
+                await pipeline.run(discover_links(http, loop, executor))
+    if queue is not None:
+        queue.close()
+    if RECRAWL:
+        changelog.report()
+    CONCURRENCY.report()
+    RETRIES.report()
+    SUPERVISOR.report()
+    WAITS.report()
+    METRICS.stop()
+    if ARCHIVE_HTML:
+        ARCHIVE.report()
+        ARCHIVE.close()
+
+
+async def reparse():
+    """Rebuild the listing rows from the archive with the current extractors."""
+    async with make_writer(OUTPUT_FORMAT, "tapaz_reparsed", SITE.columns, normalize=NORMALIZE) as writer:
+        async for row in ARCHIVE.reparse(extract_listing):
+            await writer.put(row)
+    ARCHIVE.close()
+
+
+async def seed(queue):
+    loop = asyncio.get_event_loop()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        async with HttpClient(per_host=HTTP_CONNECTIONS_PER_HOST, rate_limit=RATE_LIMIT) as http:
+            async for links in discover_links(http, loop, executor):
+                queue.enqueue(QUEUE_NAME, links)
+    queue.seal(QUEUE_NAME)
+
+
+if __name__ == '__main__':
+    args = crawl_arguments("Scrape tap.az listings.").parse_args()
+    start_time = time.time()
+    run_crawl(main, args, seed=seed, reparse=reparse, queue_name=QUEUE_NAME)
+    end_time = time.time()
+    execution_time = end_time - start_time
+    print(f"Execution time: {execution_time} seconds")
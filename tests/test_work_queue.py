@@ -0,0 +1,31 @@
+import asyncio
+
+from scraping_core.pipeline import Pipeline
+from scraping_core.work_queue import WorkQueue
+
+
+def test_leased_cards_are_acked_after_processing(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.sqlite'), lease_seconds=0)
+    cards = [{'item_id': str(n), 'url': f'https://tap.az/elanlar/{n}'} for n in range(5)]
+    queue.enqueue('cards', cards)
+    queue.seal('cards')
+
+    async def leased_item(job):
+        return [dict(job)]
+
+    async def process_card(card, job):
+        # What tapaz does to a card before writing it
+        card['change'] = 'insert'
+        card['source'] = 'detail'
+
+    async def item_done(job, items):
+        queue.ack('cards', job)
+
+    async def crawl():
+        pipeline = Pipeline(leased_item, process_card, producers=1, consumers=3, on_page_done=item_done)
+        await pipeline.run(queue.leased('cards', poll=0.01))
+
+    asyncio.run(asyncio.wait_for(crawl(), 10))
+    assert queue.drained('cards')
+    assert queue.counts('cards') == {'done': len(cards)}
+    queue.close()